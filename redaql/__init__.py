@@ -0,0 +1,12 @@
+# headless api is imported lazily, so that importing a submodule stays light.
+_API_NAMES = ('connect', 'Connection', 'Result')
+
+
+def __getattr__(name):
+    if name in _API_NAMES:
+        from redaql import api
+        return getattr(api, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+__all__ = list(_API_NAMES)
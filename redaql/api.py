@@ -0,0 +1,270 @@
+import codecs
+import time
+
+from redaql import constants
+from redaql import result_store
+from redaql.client import RedaqlAPIClient, wire_bytes
+from redaql.exceptions import NotFoundDataSourceException
+from redaql.metrics import Metrics
+from redaql.schema_cache import SchemaCache
+
+
+# bytes per read of streamed result
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def connect(api_key=None, host=None, proxy=None, datasource=None, **options):
+    """
+    create headless connection. nothing is printed, and no request is sent until needed.
+
+    >>> conn = redaql.connect(api_key='xxx', host='https://your-redash-server/')
+    >>> result = conn.execute('select id, name from users', datasource='metadata')
+    >>> for row in result:
+    ...     print(row)
+
+    :param str api_key: default is REDASH_API_KEY environment variable.
+    :param str host: default is REDASH_SERVICE_URL environment variable.
+    :param str proxy: default is REDASH_HTTP_PROXY environment variable.
+    :param str datasource: default datasource name for execute.
+    :param options: see Connection.
+    :rtype: Connection
+    """
+    return Connection(api_key=api_key, host=host, proxy=proxy, datasource=datasource, **options)
+
+
+class Connection:
+    """
+    redash server connection. api client, schema cache and metrics are kept per connection.
+    """
+
+    def __init__(
+            self,
+            api_key=None,
+            host=None,
+            proxy=None,
+            datasource=None,
+            spill_threshold=constants.DEFAULT_SPILL_THRESHOLD,
+            rate_limit=constants.DEFAULT_RATE_LIMIT,
+            max_concurrent_jobs=constants.DEFAULT_MAX_CONCURRENT_JOBS,
+            metrics: Metrics = None,
+            stream_results=False,
+            pool_size=constants.DEFAULT_POOL_SIZE,
+            connect_timeout=constants.DEFAULT_CONNECT_TIMEOUT,
+            read_timeout=constants.DEFAULT_READ_TIMEOUT,
+    ):
+        """
+        :param bool stream_results: download results as csv with chunked reads, and parse them row by row.
+            column types are inferred, and runtime is time until the job finished.
+        :param int pool_size: kept alive http connections.
+        :param float connect_timeout: seconds
+        :param float read_timeout: seconds
+        """
+        self.datasource = datasource
+        self.spill_threshold = spill_threshold
+        self.stream_results = stream_results
+        self.metrics = metrics or Metrics()
+        self.client = RedaqlAPIClient(
+            api_key=api_key,
+            host=host,
+            proxy=proxy,
+            timeout=None,
+            rate_limit=rate_limit,
+            max_concurrent_jobs=max_concurrent_jobs,
+            metrics=self.metrics,
+            pool_size=pool_size,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+        )
+        self.schema_cache = SchemaCache(self.client)
+
+    @property
+    def host(self):
+        return self.client.host
+
+    def get_server_version(self):
+        return self.client.get_server_version()
+
+    def get_data_sources(self):
+        """
+        :return: [{'name': 'xxx', 'type': 'pg', 'id': 1, ...}, ...]
+        """
+        return self.client.get_data_sources()
+
+    def get_schema(self, datasource=None):
+        """
+        :return: [{'name': 'table', 'columns': ['col1', ...]}, ...]
+        """
+        return self.schema_cache.get_schema(self._get_datasource(datasource))
+
+    def execute(self, sql: str, datasource=None, max_age=0, **parameters):
+        """
+        execute query and wait for its result.
+        :param str sql:
+        :param str datasource: datasource name. default is the datasource of connect.
+        :param int max_age: seconds. redash returns cached result newer than this. 0 always executes.
+        :param parameters: query parameters
+        :rtype: Result
+        """
+        datasource = self._get_datasource(datasource)
+        if self.stream_results:
+            return self._execute_streaming(sql, datasource, max_age, **parameters)
+        start = time.monotonic()
+        response = self.client.get_adhoc_query_result(
+            query=sql,
+            data_source_name=datasource,
+            max_age=max_age,
+            **parameters
+        )
+        query_result = response['query_result']
+        store = result_store.from_query_result(query_result, spill_threshold=self.spill_threshold)
+        return Result(
+            store=store,
+            query=sql,
+            datasource=datasource,
+            elapsed=time.monotonic() - start,
+            query_result_id=query_result.get('id'),
+            retrieved_at=query_result.get('retrieved_at'),
+        )
+
+    def _execute_streaming(self, sql, datasource, max_age, **parameters):
+        start = time.monotonic()
+        query_result_id = self.client.wait_adhoc_query_result_id(
+            query=sql,
+            data_source_name=datasource,
+            max_age=max_age,
+            **parameters
+        )
+        runtime = time.monotonic() - start
+        res = self.client.open_query_result(query_result_id, file_type='csv')
+        decoded_bytes = 0
+
+        def _chunks():
+            nonlocal decoded_bytes
+            for chunk in res.iter_content(chunk_size=STREAM_CHUNK_SIZE):
+                decoded_bytes += len(chunk)
+                yield chunk
+
+        try:
+            store = result_store.from_csv(_iter_lines(_chunks()), runtime=runtime, spill_threshold=self.spill_threshold)
+        finally:
+            self.metrics.observe_transfer(wire_bytes(res), decoded_bytes)
+            res.close()
+        return Result(
+            store=store,
+            query=sql,
+            datasource=datasource,
+            elapsed=time.monotonic() - start,
+            query_result_id=query_result_id,
+        )
+
+    def close(self):
+        self.client.s.close()
+
+    def _get_datasource(self, datasource):
+        datasource = datasource or self.datasource
+        if not datasource:
+            raise NotFoundDataSourceException('datasource is not specified.')
+        return datasource
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class Result:
+    """
+    query result. iterate rows(tuple ordered by columns), or access values by column name.
+    large results are spilled to a temporary file, so call close(or use with) to remove it early.
+    """
+
+    def __init__(self, store, query=None, datasource=None, elapsed=None, query_result_id=None, retrieved_at=None):
+        """
+        :param redaql.result_store.ResultStore store:
+        """
+        self.store = store
+        self.query = query
+        self.datasource = datasource
+        self.elapsed = elapsed
+        self.query_result_id = query_result_id
+        self.retrieved_at = retrieved_at
+
+    @property
+    def columns(self):
+        """ column names """
+        return list(self.store.column_names)
+
+    @property
+    def column_types(self):
+        """ {column name: redash type} """
+        return {col['name']: col.get('type') for col in self.store.columns}
+
+    @property
+    def runtime(self):
+        """ query runtime on redash(seconds) """
+        return self.store.runtime
+
+    @property
+    def metadata(self):
+        return {
+            'query': self.query,
+            'datasource': self.datasource,
+            'columns': self.store.columns,
+            'row_count': len(self.store),
+            'runtime': self.runtime,
+            'elapsed': self.elapsed,
+            'query_result_id': self.query_result_id,
+            'retrieved_at': self.retrieved_at,
+            'spilled': self.store.is_spilled,
+        }
+
+    def __len__(self):
+        return len(self.store)
+
+    def __iter__(self):
+        for row in self.store.iter_rows():
+            yield tuple(row)
+
+    def column(self, name):
+        """
+        :return: values of the column
+        :rtype: list
+        """
+        try:
+            idx = self.store.column_names.index(name)
+        except ValueError:
+            raise KeyError(name)
+        return [row[idx] for row in self.store.iter_rows()]
+
+    def iter_dicts(self):
+        names = self.store.column_names
+        for row in self.store.iter_rows():
+            yield dict(zip(names, row))
+
+    def close(self):
+        self.store.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self):
+        return f'<Result columns={self.columns} rows={len(self)}>'
+
+
+def _iter_lines(chunks):
+    """
+    decode byte chunks and yield lines with line endings, for csv.reader.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    pending = ''
+    for chunk in chunks:
+        *lines, pending = (pending + decoder.decode(chunk)).split('\n')
+        for line in lines:
+            yield line + '\n'
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending
@@ -0,0 +1,14 @@
+import sys
+
+
+def main():
+    """
+    entry point of redaql command. batch mode is forwarded to the running daemon
+    before heavy modules(prompt_toolkit, redash_py) are imported.
+    """
+    from redaql import daemon
+    code = daemon.forward(sys.argv[1:])
+    if code is not None:
+        sys.exit(code)
+    from redaql.command import main as command_main
+    command_main()
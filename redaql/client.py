@@ -0,0 +1,357 @@
+import copy
+import random
+import threading
+import time
+import urllib.parse
+
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+from redash_py.client import RedashAPIClient
+from redash_py.exceptions import ErrorResponseException, ResourceNotFoundException, SQLErrorException, TimeoutException
+
+from redaql import constants
+from redaql.metrics import Metrics
+from redaql.statement_splitter import normalize_sql
+
+# server is overloaded. retry after backoff.
+RETRYABLE_STATUS_CODES = (429, 503)
+# redash job status
+JOB_FAILURE = 4
+JOB_CANCELLED = 5
+
+
+class RateLimiter:
+    """
+    token bucket. rate tokens are added per second up to burst.
+    """
+
+    def __init__(self, rate: float, burst: int = None):
+        """
+        :param float rate: requests per second. 0 or None means unlimited.
+        :param int burst: bucket size.
+        """
+        self.rate = rate
+        self.burst = burst or max(1, int(rate or 1))
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def wire_bytes(res):
+    """
+    body bytes read from the wire(before gzip decoding) of the response.
+    """
+    try:
+        return res.raw.tell()
+    except (AttributeError, OSError):
+        return int(res.headers.get('Content-Length') or 0)
+
+
+class ThrottledSession(requests.Session):
+    """
+    pooled keep-alive session which waits for rate limiter before every request,
+    and retries 429/503 responses with jittered exponential backoff.
+    responses are gzip compressed if the server supports.
+    """
+
+    def __init__(self, rate_limiter: RateLimiter, metrics: Metrics, max_retries=constants.DEFAULT_MAX_RETRIES,
+                 backoff_base=constants.DEFAULT_BACKOFF_BASE, backoff_max=constants.DEFAULT_BACKOFF_MAX,
+                 pool_size=constants.DEFAULT_POOL_SIZE, timeout=None):
+        """
+        :param int pool_size: kept alive connections per host.
+        :param timeout: default seconds of requests without timeout. i.e) (connect, read)
+        """
+        super().__init__()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.mount('http://', adapter)
+        self.mount('https://', adapter)
+        self.headers.update({'Accept-Encoding': 'gzip', 'Connection': 'keep-alive'})
+        self.rate_limiter = rate_limiter
+        self.metrics = metrics
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+
+    def request(self, method, url, *args, **kwargs):
+        # redash_py posts without timeout. a stalled server must not hang forever.
+        if self.timeout:
+            kwargs.setdefault('timeout', self.timeout)
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+            start = time.monotonic()
+            res = super().request(method, url, *args, **kwargs)
+            self.metrics.observe_http(method, res.status_code, time.monotonic() - start)
+            # streamed body is not read yet. its reader observes transfer.
+            if not kwargs.get('stream'):
+                self.metrics.observe_transfer(wire_bytes(res), len(res.content))
+            if res.status_code not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+                return res
+            res.close()
+            time.sleep(self._get_backoff(attempt, res.headers.get('Retry-After')))
+            attempt += 1
+
+    def _get_backoff(self, attempt, retry_after=None):
+        if retry_after and retry_after.isdigit():
+            return min(self.backoff_max, int(retry_after)) + random.uniform(0, self.backoff_base)
+        # full jitter
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+
+class SingleFlight:
+    """
+    in-flight registry. while a call for the key is running,
+    later callers wait for it and share its result instead of calling again.
+    only calls overlapping in time share(i.e. threads of \\dash, \\partition, \\diff, or api users).
+    finished results are not kept, since max_age=0 asks to execute. sequential repeats with max_age > 0
+    are served by the query result cache of redash.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self._local = threading.local()
+
+    def do(self, key, func):
+        with self._lock:
+            followers = self._in_flight.get(key)
+            if followers is None:
+                self._in_flight[key] = []
+            else:
+                future = Future()
+                followers.append(future)
+        self._local.shared = followers is not None
+        if followers is not None:
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as e:
+            for future in self._finish(key):
+                future.set_exception(e)
+            raise
+        for future in self._finish(key):
+            # every caller owns its result, because results are consumed destructively.
+            future.set_result(copy.deepcopy(result))
+        return result
+
+    def last_shared(self):
+        """ last call on current thread attached to a running call. """
+        return getattr(self._local, 'shared', False)
+
+    def in_flight_count(self):
+        with self._lock:
+            return len(self._in_flight)
+
+    def _finish(self, key):
+        with self._lock:
+            return self._in_flight.pop(key)
+
+
+class RedaqlAPIClient(RedashAPIClient):
+    """
+    RedashAPIClient with client side rate limit and in-flight job budget.
+    datasources are kept in a registry, so that queries do not fetch them every time.
+    """
+
+    def __init__(
+            self,
+            api_key=None,
+            host=None,
+            proxy=None,
+            timeout=None,
+            rate_limit=constants.DEFAULT_RATE_LIMIT,
+            max_concurrent_jobs=constants.DEFAULT_MAX_CONCURRENT_JOBS,
+            metrics: Metrics = None,
+            pool_size=constants.DEFAULT_POOL_SIZE,
+            connect_timeout=constants.DEFAULT_CONNECT_TIMEOUT,
+            read_timeout=constants.DEFAULT_READ_TIMEOUT,
+            job_timeout=constants.DEFAULT_JOB_TIMEOUT,
+    ):
+        """
+        :param timeout: seconds for requests. if not set, (connect_timeout, read_timeout) is used.
+        :param job_timeout: seconds to wait for a query job. 0 or None waits forever.
+        """
+        super().__init__(api_key=api_key, host=host, proxy=proxy, timeout=timeout)
+        if not timeout:
+            self.timeout = (connect_timeout, read_timeout)
+        self.metrics = metrics or Metrics()
+        session = ThrottledSession(RateLimiter(rate_limit), self.metrics, pool_size=pool_size, timeout=self.timeout)
+        session.headers.update({'Authorization': self.s.headers['Authorization']})
+        session.proxies.update(self.s.proxies)
+        self.s.close()
+        self.s = session
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.job_timeout = job_timeout
+        self._job_slots = threading.BoundedSemaphore(max_concurrent_jobs) if max_concurrent_jobs else None
+        self.single_flight = SingleFlight()
+        self._data_sources_lock = threading.Lock()
+        self._data_sources = None
+
+    def get_data_sources(self):
+        """
+        fetch datasources and refresh the registry.
+        """
+        data_sources = super().get_data_sources()
+        with self._data_sources_lock:
+            self._data_sources = {ds['name']: ds for ds in data_sources}
+        return data_sources
+
+    def get_data_source_by_name(self, name: str):
+        """
+        from the registry. refreshed once if not found(i.e. added after start up).
+        """
+        with self._data_sources_lock:
+            data_sources = self._data_sources
+        if data_sources is None or name not in data_sources:
+            self.get_data_sources()
+            with self._data_sources_lock:
+                data_sources = self._data_sources
+        if name not in data_sources:
+            raise ResourceNotFoundException(f'{name} is not found')
+        return data_sources[name]
+
+    def get_adhoc_query_result(self, query: str, data_source_name: str, retry_count=5, max_age=-1, **kwargs):
+        """
+        identical statements(same datasource, same normalized sql) running concurrently
+        are executed once on redash. see SingleFlight for the scope.
+        :param retry_count: ignored. job is waited by _wait_job, until job_timeout.
+        """
+        key = (data_source_name, normalize_sql(query), max_age, repr(sorted(kwargs.items())))
+
+        def _execute():
+            with self._job_slot():
+                return super(RedaqlAPIClient, self).get_adhoc_query_result(
+                    query, data_source_name, retry_count=retry_count, max_age=max_age, **kwargs
+                )
+
+        return self.single_flight.do(key, _execute)
+
+    def wait_adhoc_query_result_id(self, query: str, data_source_name: str, max_age=-1, **kwargs):
+        """
+        execute query and wait for the job, without downloading its result.
+        :return: query result id
+        """
+        key = ('result_id', data_source_name, normalize_sql(query), max_age, repr(sorted(kwargs.items())))
+
+        def _execute():
+            with self._job_slot():
+                data_source = self.get_data_source_by_name(data_source_name)
+                res = self._post('query_results', payload={
+                    'query': query,
+                    'query_id': 'adhoc',
+                    'data_source_id': data_source['id'],
+                    'max_age': max_age,
+                    'parameters': kwargs,
+                })
+                # already has a result
+                if 'query_result' in res:
+                    return res['query_result']['id']
+                return self._wait_job(res['job']['id'])
+
+        return self.single_flight.do(key, _execute)
+
+    def open_query_result(self, query_result_id, file_type='csv'):
+        """
+        download query result with chunked reads.
+        :param str file_type: csv or json
+        :return: streamed response. caller must close it.
+        :rtype: requests.Response
+        """
+        url = urllib.parse.urljoin(f'{self.host}/api/', f'query_results/{query_result_id}.{file_type}')
+        res = self.s.get(url, timeout=self.timeout, stream=True)
+        if res.status_code != 200:
+            res.close()
+            raise ErrorResponseException(f'Retrieve data from URL: {url} failed.', status_code=res.status_code)
+        # gzip body is decoded while reading
+        res.raw.decode_content = True
+        return res
+
+    def _check_and_wait_query_result(self, job_id, retry_count=None, retry_interval=None):
+        """
+        redash_py polls the job without interval, and misses cancelled jobs.
+        every job wait of redash_py(adhoc, saved query, schema) goes through _wait_job.
+        """
+        return self._get(f'query_results/{self._wait_job(job_id)}')
+
+    def _wait_job(self, job_id):
+        deadline = time.monotonic() + self.job_timeout if self.job_timeout else None
+        interval = constants.JOB_POLL_INTERVAL
+        while True:
+            job = self._get(f'jobs/{job_id}')['job']
+            if job['query_result_id']:
+                return job['query_result_id']
+            if job['status'] in (JOB_FAILURE, JOB_CANCELLED):
+                raise SQLErrorException(job['error'] or 'query job failed.')
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutException(f'query job {job_id} did not finish in {self.job_timeout}s.')
+                interval = min(interval, remaining)
+            time.sleep(interval)
+            interval = min(constants.JOB_POLL_INTERVAL_MAX, interval * 2)
+
+    def get_dashboard(self, dashboard_id):
+        """
+        :param dashboard_id: id, or slug for old redash.
+        :return: dashboard with widgets. widget has visualization.query unless it is a text widget.
+        """
+        return self._get(f'dashboards/{dashboard_id}')
+
+    def update_query(self, query_id: int, name=None, data_source_name: str = None, query: str = None,
+                     description: str = None, is_publish: bool = True):
+        """
+        redash_py drops empty description, so that it can not be cleared. only None is not updated.
+        """
+        payload = {}
+        if name:
+            payload['name'] = name
+        if data_source_name:
+            payload['data_source_id'] = self.get_data_source_by_name(data_source_name)['id']
+        if query:
+            payload['query'] = query
+        if description is not None:
+            payload['description'] = description
+        # draft false is published
+        payload['is_draft'] = not is_publish
+        return self._post(f'queries/{query_id}', payload)
+
+    def get_query_result(self, query_result_id):
+        """
+        cached result by query result id. no job is executed.
+        """
+        return self._get(f'query_results/{query_result_id}')
+
+    def get_query_results_by_id(self, *args, **kwargs):
+        with self._job_slot():
+            return super().get_query_results_by_id(*args, **kwargs)
+
+    def get_data_source_schema(self, *args, **kwargs):
+        with self._job_slot():
+            return super().get_data_source_schema(*args, **kwargs)
+
+    @contextmanager
+    def _job_slot(self):
+        if self._job_slots is None:
+            yield
+            return
+        with self._job_slots:
+            yield
@@ -1,10 +1,14 @@
 import argparse
+import importlib
+import os
 import sys
 import re
 import traceback
 import dataclasses
 
-from typing import Optional
+from collections import deque
+
+from typing import Optional, List
 from os.path import expanduser
 from textwrap import dedent
 
@@ -12,11 +16,19 @@ from redaql import utils
 from redaql import exceptions
 from redaql import special_commands
 from redaql import constants
-from redaql.query_executor import QueryExecutor
+from redaql import dialects
+from redaql import incremental
+from redaql.api import Connection
+from redaql.metrics import Metrics
+from redaql.preflight import Preflight, RuntimeHistory, MODE_OFF, MODE_CONFIRM, MODES
+from redaql.profiles import Profile, get_profile, load_profiles
+from redaql.query_executor import QueryExecutor, get_report
+from redaql.sampling import Sample
+from redaql.statement_splitter import StatementSplitter
+from redaql.usage import UsageIndex, UsageRankedCompleter
 from prompt_toolkit import prompt
 from prompt_toolkit.history import FileHistory
 from prompt_toolkit.completion import FuzzyWordCompleter
-from redash_py.client import RedashAPIClient
 from redash_py.exceptions import RedashPyException
 from redaql.__version__ import __VERSION__
 
@@ -27,11 +39,32 @@ class Args:
     host: Optional[str]
     proxy: Optional[str]
     initial_data_source_name: Optional[str]
+    spill_threshold: Optional[int]
+    rate_limit: float
+    max_concurrent_jobs: int
+    prewarm: Optional[str]
+    metrics_log: Optional[str]
+    metrics_prometheus: Optional[str]
+    preflight: str
+    preflight_max_runtime: float
+    preflight_max_cost: Optional[float]
+    preflight_full_scan_rows: int
+    partition_parallelism: int
+    stream_results: bool
+    profile: Optional[str]
+    pool_size: int
+    connect_timeout: float
+    read_timeout: float
 
     def to_dict(self):
         return dataclasses.asdict(self)
 
 
+@dataclasses.dataclass(frozen=True)
+class BatchArgs:
+    commands: List[str]
+
+
 @dataclasses.dataclass(frozen=True)
 class LastQuery:
     sql: str
@@ -45,24 +78,157 @@ class Redaql:
         host=None,
         proxy=None,
         initial_data_source_name=None,
+        spill_threshold=None,
+        rate_limit=constants.DEFAULT_RATE_LIMIT,
+        max_concurrent_jobs=constants.DEFAULT_MAX_CONCURRENT_JOBS,
+        prewarm=None,
+        metrics_log=None,
+        metrics_prometheus=None,
+        preflight=MODE_OFF,
+        preflight_max_runtime=constants.DEFAULT_PREFLIGHT_MAX_RUNTIME,
+        preflight_max_cost=None,
+        preflight_full_scan_rows=constants.DEFAULT_PREFLIGHT_FULL_SCAN_ROWS,
+        partition_parallelism=constants.DEFAULT_PARTITION_PARALLELISM,
+        stream_results=False,
+        profile=None,
+        pool_size=constants.DEFAULT_POOL_SIZE,
+        connect_timeout=constants.DEFAULT_CONNECT_TIMEOUT,
+        read_timeout=constants.DEFAULT_READ_TIMEOUT,
+        show_banner=True,
     ):
-        self.client = RedashAPIClient(
+        self.metrics = Metrics(log_path=metrics_log, prometheus_path=metrics_prometheus)
+        # used for settings which profile does not have
+        self.connection_options = dict(
             api_key=api_key,
             host=host,
             proxy=proxy,
-            timeout=None,
+            spill_threshold=spill_threshold,
+            rate_limit=rate_limit,
+            max_concurrent_jobs=max_concurrent_jobs,
+            stream_results=stream_results,
+            pool_size=pool_size,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+        )
+        self.profiles_path = expanduser(constants.PROFILES_PATH)
+        self.profile_name = profile or constants.ARGS_PROFILE
+        initial_profile = self._get_profile(self.profile_name)
+        self.connection = self._create_connection(initial_profile)
+        # profile name -> connection. kept after switching, with its http pool, datasources and schema cache.
+        self.connections = {self.profile_name: self.connection}
+        self.profile_data_sources = {}
+        self.preflight = Preflight(
+            client=self.client,
+            history=RuntimeHistory(expanduser(constants.PREFLIGHT_HISTORY_PATH)),
+            mode=preflight,
+            max_runtime=preflight_max_runtime,
+            max_cost=preflight_max_cost,
+            full_scan_rows=preflight_full_scan_rows,
         )
-        self.data_source_name = initial_data_source_name
+        self.data_source_name = initial_data_source_name or initial_profile.data_source_name
+        self.prewarm = prewarm
         self.pivot_result = False
-        self.buffer = []
+        self.sample = Sample()
+        # column of high-water mark for \\incremental
+        self.incremental_column = None
+        self.incremental_store = incremental.IncrementalStore(expanduser(constants.INCREMENTAL_PATH))
+        self.splitter = StatementSplitter()
+        self.statement_queue = deque()
         self.complete_sources = []
         self.complete_meta_dict = {}
-        self.history = FileHistory(f'{expanduser("~")}/.redaql.hist')
+        self.history = FileHistory(expanduser(constants.HISTORY_PATH))
+        self.usage_index = UsageIndex(expanduser(constants.USAGE_PATH))
         self.last_succeeded_query: Optional[LastQuery] = None
+        self.partition_parallelism = partition_parallelism
+        self.last_result = None
+        # result before the last one, for \\diff
+        self.previous_result = None
+        # results retained by \\as, for \\join
+        self.named_results = {}
+        self.show_banner = show_banner
         self.init()
 
+    @property
+    def client(self):
+        return self.connection.client
+
+    @property
+    def schema_cache(self):
+        return self.connection.schema_cache
+
+    @property
+    def spill_threshold(self):
+        return self.connection.spill_threshold
+
     def init(self):
         version = self.client.get_server_version()
+        if self.show_banner:
+            self._print_banner(version)
+
+        if self.data_source_name is None:
+            self.complete_sources += [d['name'] for d in self.client.get_data_sources()]
+        else:
+            # need completer
+            self.execute_special_command(f'\\c {self.data_source_name}')
+
+        if self.prewarm:
+            self.prewarm_schemas(self.prewarm)
+
+    def _get_profile(self, name):
+        if name == constants.ARGS_PROFILE and name not in load_profiles(self.profiles_path):
+            return Profile(name=name)
+        return get_profile(self.profiles_path, name)
+
+    def _create_connection(self, profile: Profile):
+        options = dict(self.connection_options)
+        default_host = options['host'] or os.environ.get('REDASH_SERVICE_URL')
+        if profile.api_key is None and profile.host is not None and not _is_same_host(profile.host, default_host):
+            # api key of command line(or environment variable) is not sent to another server
+            raise exceptions.InvalidArgumentException(
+                f'profile {profile.name} needs api_key, since its server_host differs from {default_host}.'
+            )
+        for key in ('api_key', 'host', 'proxy', 'rate_limit', 'max_concurrent_jobs'):
+            if getattr(profile, key) is not None:
+                options[key] = getattr(profile, key)
+        return Connection(**options, metrics=self.metrics)
+
+    def switch_profile(self, name, data_source_name=None):
+        """
+        switch redash server. connection of the profile is reused if connected before.
+        """
+        connection = self.connections.get(name)
+        if connection is None:
+            profile = self._get_profile(name)
+            connection = self._create_connection(profile)
+            # fail before switching
+            connection.get_server_version()
+            self.connections[name] = connection
+            self.profile_data_sources.setdefault(name, profile.data_source_name)
+        self.profile_data_sources[self.profile_name] = self.data_source_name
+        data_source_name = data_source_name or self.profile_data_sources.get(name)
+
+        self.profile_name = name
+        self.connection = connection
+        self.preflight.client = connection.client
+        self.last_succeeded_query = None
+        self.data_source_name = None
+        self.reset_completer()
+        if data_source_name:
+            self.execute_special_command(f'\\c {data_source_name}')
+        else:
+            self.complete_sources += [d['name'] for d in self.client.get_data_sources()]
+
+    def prewarm_schemas(self, prewarm):
+        """
+        :param str prewarm: '*' for all datasources, or comma separated datasource names.
+        """
+        ds_names = [ds['name'] for ds in self.client.get_data_sources()]
+        if prewarm != constants.PREWARM_ALL:
+            targets = [name.strip() for name in prewarm.split(',') if name.strip()]
+            ds_names = [name for name in targets if name in ds_names]
+        self.schema_cache.prewarm(ds_names)
+
+    def _print_banner(self, version):
         print(dedent(f"""
            ___         __          __
           / _ \___ ___/ /__ ____ _/ /
@@ -77,12 +243,6 @@ class Redaql:
 
         """))
 
-        if self.data_source_name is None:
-            self.complete_sources += [d['name'] for d in self.client.get_data_sources()]
-        else:
-            # need completer
-            self.execute_special_command(f'\\c {self.data_source_name}')
-
     def loop(self):
         try:
             answer = prompt(
@@ -93,94 +253,207 @@ class Redaql:
             self.handle(answer)
         except (exceptions.RedaqlException, RedashPyException) as e:
             print(e)
-            self.buffer = []
+            self.reset_buffer()
         except KeyboardInterrupt as e:
             print('if want to exit, use \\q')
-            self.buffer = []
+            self.reset_buffer()
         except EOFError as e:
             print('Bye.')
             sys.exit(0)
 
+    def run_batch(self, commands):
+        """
+        execute commands(query or special command) in order, then flush remaining statement.
+        """
+        for command in commands:
+            self.handle(command)
+        if self.splitter.has_pending:
+            raise exceptions.InvalidArgumentException('last statement is not terminated by semicolon.')
+
     def handle(self, text):
-        if text == '':
+        if text == '' and not self.splitter.has_pending:
             return
 
-        if utils.is_special_command(text):
+        if not self.splitter.in_literal and utils.is_special_command(text):
             self.execute_special_command(text)
-            self.buffer = []
+            self.reset_buffer()
             return
 
         if not self.data_source_name:
             print('select datasource via \\c')
             return
 
-        self.buffer.append(text)
-        if utils.is_end(text):
-            self.execute_query()
-            self.buffer = []
-            return
+        if not self.splitter.has_pending:
+            data_source_type = self.client.get_data_source_by_name(self.data_source_name)['type']
+            options = dialects.get_lexer_options(data_source_type)
+            self.splitter.backslash_escape = options['backslash_escape']
+            self.splitter.hash_comment = options['hash_comment']
+        self.statement_queue.extend(self.splitter.feed(text))
+        while self.statement_queue:
+            self.execute_query(self.statement_queue.popleft())
+
+    def reset_buffer(self):
+        self.splitter.reset()
+        self.statement_queue.clear()
 
-    def execute_query(self):
+    def execute_query(self, query):
         self.last_succeeded_query = None
-        query = ' '.join(self.buffer)
-        executor = QueryExecutor(
-            redaql_instance=self,
-            query_string=query,
-            datasource_name=self.data_source_name,
-            pivot_result=self.pivot_result
-        )
-        result = executor.execute_query()
+        self.set_last_result(None)
+        executed_query = query
+        if self.incremental_column and self.sample.enabled and incremental.is_select(query):
+            # sampled rows would be stored as if they were all rows past the mark
+            raise exceptions.InvalidArgumentException(
+                '\\incremental can not be used with \\sample. turn off either of them.'
+            )
+        if self.sample.enabled:
+            data_source_type = self.client.get_data_source_by_name(self.data_source_name)['type']
+            executed_query = self.sample.rewrite(query, data_source_type)
+        incremental_key = None
+        if self.incremental_column and incremental.is_select(query):
+            incremental_key = incremental.get_key(self.client.host, self.data_source_name, query, self.incremental_column)
+            mark = self.incremental_store.get_mark(incremental_key)
+            if mark is not None:
+                executed_query = incremental.rewrite(executed_query, self.incremental_column, mark)
+        if self.preflight.enabled:
+            self._preflight(executed_query)
+        with self.metrics.track('query', datasource=self.data_source_name, sql=executed_query) as record:
+            executor = QueryExecutor(
+                redaql_instance=self,
+                query_string=executed_query,
+                datasource_name=self.data_source_name,
+                pivot_result=self.pivot_result
+            )
+            result = executor.execute_query()
+            record['rows'] = len(self.last_result)
+            record['redash_runtime'] = self.last_result.runtime
+            record['cache'] = 'hit' if self.client.single_flight.last_shared() else 'miss'
+        self.preflight.history.record(self.client.host, self.data_source_name, executed_query, self.last_result.runtime)
+        self.usage_index.record(self.client.host, self.data_source_name, query, self._get_schema_words())
+        if incremental_key is not None:
+            result = self._append_incremental(incremental_key, query)
         self._display(result)
+        # saved query(\\s) is not sampled
         self.last_succeeded_query = LastQuery(
             sql=query,
             datasource_name=self.data_source_name
         )
 
+    def _append_incremental(self, key, query):
+        """
+        append fetched rows to the stored rows of the statement, which become the last result.
+        """
+        fetched = self.last_result
+        fetched_count = len(fetched)
+        mark = self.incremental_store.append(key, self.data_source_name, query, self.incremental_column, fetched)
+        stored = self.incremental_store.load(key, spill_threshold=self.spill_threshold, runtime=fetched.runtime)
+        fetched.close()
+        self.last_result = stored
+        print(f'[INCREMENTAL] {fetched_count} new rows. high-water mark {self.incremental_column} = {mark}')
+        return get_report(stored, self.pivot_result)
+
+    def _preflight(self, query):
+        warnings = self.preflight.check(query, self.data_source_name)
+        if not warnings:
+            return
+        for warning in warnings:
+            print(f'[PREFLIGHT] {warning}')
+        if self.preflight.mode != MODE_CONFIRM:
+            return
+        if not sys.stdin.isatty() or input('execute anyway? [y/N] ').strip().lower() != 'y':
+            raise exceptions.PreflightRejectedException('query cancelled by preflight.')
+
     def execute_special_command(self, command_string):
         spc_handler = SpecialCommandHandler(self, command_string)
-        result = spc_handler.execute()
+        with self.metrics.track(
+            'special_command', datasource=self.data_source_name, command=spc_handler.sp_command
+        ):
+            result = spc_handler.execute()
         self._display(result)
 
+    def set_last_result(self, result):
+        """
+        the current last result becomes the previous result.
+        """
+        if self.last_result is not None:
+            if self.previous_result is not None and not self.is_named_result(self.previous_result):
+                self.previous_result.close()
+            self.previous_result = self.last_result
+        self.last_result = result
+
+    def is_named_result(self, result):
+        return any(named is result for named in self.named_results.values())
+
     def reset_completer(self):
         self.complete_sources = []
         self.complete_meta_dict = {}
 
-    def set_query_mode_completer(self, schema, meta_dict=None):
-        self.complete_sources += constants.SQL_KEYWORDS
+    def set_query_mode_completer(self, schema, meta_dict=None, data_source_type=None, syntax='sql'):
+        """
+        :param str data_source_type: keywords and functions of its dialect are completed.
+        """
+        keywords, keyword_meta_dict = dialects.get_completion(data_source_type, syntax)
+        self.complete_sources += keywords
         self.complete_sources += schema
-        base_meta_dict = {k: 'keyword' for k in constants.SQL_KEYWORDS}
+        base_meta_dict = dict(keyword_meta_dict)
         if meta_dict:
             base_meta_dict.update(meta_dict)
         self.complete_meta_dict = base_meta_dict
 
     def _get_prompt(self):
         data_source_name = self.data_source_name if self.data_source_name else '(No DataSource)'
-        if self.buffer:
+        if self.profile_name != constants.ARGS_PROFILE:
+            data_source_name = f'{self.profile_name}:{data_source_name}'
+        if self.sample.enabled:
+            data_source_name = f'{data_source_name}[sample {self.sample}]'
+        if self.incremental_column:
+            data_source_name = f'{data_source_name}[incremental {self.incremental_column}]'
+        if self.splitter.has_pending:
             return f'{data_source_name}-# '
         return f'{data_source_name}=# '
 
+    def _get_schema_words(self):
+        return [word for word, meta in self.complete_meta_dict.items() if meta in ('table', 'column')]
+
     def _get_completer(self):
         self.complete_sources = list(set(self.complete_sources))
-        return FuzzyWordCompleter(
-            words=self.complete_sources,
-            meta_dict=self.complete_meta_dict
+        usage = self.usage_index.get_usage(self.client.host, self.data_source_name) if self.data_source_name else {}
+        # show usage count
+        meta_dict = dict(self.complete_meta_dict)
+        for word, (count, _) in usage.items():
+            if word in meta_dict:
+                meta_dict[word] = f'{meta_dict[word]} {count}x'
+        return UsageRankedCompleter(
+            FuzzyWordCompleter(
+                words=self.complete_sources,
+                meta_dict=meta_dict
+            ),
+            usage=usage,
         )
 
     def _display(self, message):
         if not message:
             return
-        print(f'\n{message}')
+        if isinstance(message, str):
+            print(f'\n{message}')
+            return
+        # streaming output(i.e. spilled result)
+        print()
+        for chunk in message:
+            sys.stdout.write(chunk)
+        sys.stdout.flush()
 
 
 class SpecialCommandHandler:
 
     def __init__(self, redaql_instance, command):
-        commands = re.split(' +', command.strip())
+        commands = re.split(' +', command.strip(), maxsplit=1)
         self.redaql_instance = redaql_instance
         self.sp_command = commands[0].split('\\')[1]
         self.option = []
         if len(commands) > 1:
-            self.option = commands[1:]
+            executor = special_commands.SP_COMMANDS.get(self.sp_command)
+            max_args = executor.max_args if executor else None
+            self.option = re.split(' +', commands[1], maxsplit=max_args or 0)
 
     def execute(self):
         if self.sp_command not in special_commands.SP_COMMANDS:
@@ -191,7 +464,13 @@ class SpecialCommandHandler:
         return executor(self.redaql_instance, *self.option).execute()
 
 
-def init():
+def _is_same_host(host, other):
+    if not host or not other:
+        return False
+    return host.rstrip('/').lower() == other.rstrip('/').lower()
+
+
+def init(argv=None):
     parser = argparse.ArgumentParser()
     parser.add_argument(
         '-k',
@@ -223,23 +502,182 @@ def init():
         """),
         default=None,
     )
-    args = parser.parse_args()
-    return Args(
+    parser.add_argument(
+        '--spill-threshold',
+        help=dedent("""
+        row count. larger results are spilled to a temporary file
+        and rendered from it. 0 disables spilling.
+        peak memory is bounded only with --stream-results. json result is decoded whole before spilling.
+        """),
+        type=int,
+        default=int(os.environ.get('REDAQL_SPILL_THRESHOLD', constants.DEFAULT_SPILL_THRESHOLD)),
+    )
+    parser.add_argument(
+        '--rate-limit',
+        help='max redash api requests per second. 0 is unlimited.',
+        type=float,
+        default=float(os.environ.get('REDAQL_RATE_LIMIT', constants.DEFAULT_RATE_LIMIT)),
+    )
+    parser.add_argument(
+        '--max-concurrent-jobs',
+        help='max query jobs running on redash at the same time. 0 is unlimited.',
+        type=int,
+        default=int(os.environ.get('REDAQL_MAX_CONCURRENT_JOBS', constants.DEFAULT_MAX_CONCURRENT_JOBS)),
+    )
+    parser.add_argument(
+        '--prewarm',
+        help=dedent("""
+        fetch schemas of datasources in background after start up.
+        without value, all datasources. or comma separated datasource names.
+        """),
+        nargs='?',
+        const=constants.PREWARM_ALL,
+        default=os.environ.get('REDAQL_PREWARM'),
+    )
+    parser.add_argument(
+        '--metrics-log',
+        help='append one json line per query and special command to this file.',
+        default=os.environ.get('REDAQL_METRICS_LOG'),
+    )
+    parser.add_argument(
+        '--metrics-prometheus',
+        help='dump session counters in prometheus text format to this file(for textfile collector).',
+        default=os.environ.get('REDAQL_METRICS_PROMETHEUS'),
+    )
+    parser.add_argument(
+        '--preflight',
+        help=dedent("""
+        estimate query cost from past runtimes and EXPLAIN before execution.
+        warn: show warnings. confirm: ask before executing expensive query.
+        """),
+        choices=MODES,
+        default=os.environ.get('REDAQL_PREFLIGHT', MODE_OFF),
+    )
+    parser.add_argument(
+        '--preflight-max-runtime',
+        help='seconds. warn if the same query took longer before.',
+        type=float,
+        default=float(os.environ.get('REDAQL_PREFLIGHT_MAX_RUNTIME', constants.DEFAULT_PREFLIGHT_MAX_RUNTIME)),
+    )
+    parser.add_argument(
+        '--preflight-max-cost',
+        help='warn if planner total cost of EXPLAIN exceeds.',
+        type=float,
+        default=os.environ.get('REDAQL_PREFLIGHT_MAX_COST'),
+    )
+    parser.add_argument(
+        '--preflight-full-scan-rows',
+        help='warn full table scan without LIMIT over this estimated rows.',
+        type=int,
+        default=int(os.environ.get('REDAQL_PREFLIGHT_FULL_SCAN_ROWS', constants.DEFAULT_PREFLIGHT_FULL_SCAN_ROWS)),
+    )
+    parser.add_argument(
+        '--partition-parallelism',
+        help='max concurrent sub queries of \\partition.',
+        type=int,
+        default=int(os.environ.get('REDAQL_PARTITION_PARALLELISM', constants.DEFAULT_PARTITION_PARALLELISM)),
+    )
+    parser.add_argument(
+        '--stream-results',
+        help=dedent("""
+        download results as csv with chunked reads and parse them row by row,
+        instead of decoding one json document. column types are inferred.
+        """),
+        action='store_true',
+        default=os.environ.get('REDAQL_STREAM_RESULTS', '').lower() in ('1', 'true', 'yes'),
+    )
+    parser.add_argument(
+        '--pool-size',
+        help='kept alive http connections to redash.',
+        type=int,
+        default=int(os.environ.get('REDAQL_POOL_SIZE', constants.DEFAULT_POOL_SIZE)),
+    )
+    parser.add_argument(
+        '--connect-timeout',
+        help='seconds to connect redash.',
+        type=float,
+        default=float(os.environ.get('REDAQL_CONNECT_TIMEOUT', constants.DEFAULT_CONNECT_TIMEOUT)),
+    )
+    parser.add_argument(
+        '--read-timeout',
+        help='seconds to wait for redash response.',
+        type=float,
+        default=float(os.environ.get('REDAQL_READ_TIMEOUT', constants.DEFAULT_READ_TIMEOUT)),
+    )
+    parser.add_argument(
+        '--profile',
+        help=dedent("""
+        connect with named profile of ~/.redaql.ini.
+        settings which the profile does not have come from other arguments.
+        """),
+        default=os.environ.get('REDAQL_PROFILE'),
+    )
+    parser.add_argument(
+        '-c',
+        '--command',
+        help=dedent("""
+        run query or special command, then exit(batch mode).
+        can be specified multiple times.
+        i.e) -c 'select * from users;' -c '\\copy users to sqlite:users.db'
+        """),
+        action='append',
+        default=[],
+    )
+    args = parser.parse_args(argv)
+    batch_args = BatchArgs(commands=args.command)
+    return batch_args, Args(
         api_key=args.api_key,
         host=args.server_host,
         proxy=args.proxy,
         initial_data_source_name=args.data_source_name,
+        spill_threshold=args.spill_threshold,
+        rate_limit=args.rate_limit,
+        max_concurrent_jobs=args.max_concurrent_jobs,
+        prewarm=args.prewarm,
+        metrics_log=args.metrics_log,
+        metrics_prometheus=args.metrics_prometheus,
+        preflight=args.preflight,
+        preflight_max_runtime=args.preflight_max_runtime,
+        preflight_max_cost=args.preflight_max_cost,
+        preflight_full_scan_rows=args.preflight_full_scan_rows,
+        partition_parallelism=args.partition_parallelism,
+        stream_results=args.stream_results,
+        profile=args.profile,
+        pool_size=args.pool_size,
+        connect_timeout=args.connect_timeout,
+        read_timeout=args.read_timeout,
     )
 
 
+# redaql <sub command> [options]
+SUB_COMMANDS = {
+    'replay': 'redaql.replay',
+    'daemon': 'redaql.daemon',
+    'sync': 'redaql.sync',
+}
+
+
 def main():
-    args = init()
+    if len(sys.argv) > 1 and sys.argv[1] in SUB_COMMANDS:
+        module = importlib.import_module(SUB_COMMANDS[sys.argv[1]])
+        module.main(sys.argv[2:])
+        return
+
+    batch_args, args = init()
     try:
-        redaql = Redaql(**args.to_dict())
+        redaql = Redaql(**args.to_dict(), show_banner=not batch_args.commands)
     except exceptions.RedaqlException as e:
         print(f'[ERROR] {e}\n')
         sys.exit(1)
 
+    if batch_args.commands:
+        try:
+            redaql.run_batch(batch_args.commands)
+        except (exceptions.RedaqlException, RedashPyException) as e:
+            print(f'[ERROR] {e}\n')
+            sys.exit(1)
+        sys.exit(0)
+
     while True:
         try:
             redaql.loop()
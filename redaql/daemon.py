@@ -0,0 +1,404 @@
+"""
+resident redaql process. it keeps http pool, datasources and schemas warm,
+and executes batch commands forwarded over a unix socket.
+only standard modules are imported at top level, so that forwarding starts fast.
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import socket
+import sys
+import time
+import traceback
+
+from contextlib import redirect_stdout
+from os.path import expanduser
+from textwrap import dedent
+
+from redaql import constants
+
+# output is sent to client per this size(or at the end of request).
+_OUTPUT_BUFFER_SIZE = 64 * 1024
+ACTIONS = ('start', 'stop', 'status')
+
+
+def get_socket_path():
+    return expanduser(os.environ.get('REDAQL_DAEMON_SOCKET', constants.DAEMON_SOCKET_PATH))
+
+
+def connect(socket_path):
+    """
+    :return: connected socket. None if daemon is not running.
+    """
+    if not os.path.exists(socket_path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def send(sock, message, out):
+    """
+    send one request, and write output to out as it arrives.
+    :param dict message: request. i.e) {'action': 'run', 'commands': [...]}
+    :return: final response. i.e) {'exit': 0}
+    """
+    with sock:
+        sock.sendall(json.dumps(message).encode('utf-8') + b'\n')
+        with sock.makefile('r', encoding='utf-8') as f:
+            for line in f:
+                response = json.loads(line)
+                if 'out' in response:
+                    out.write(response['out'])
+                    continue
+                out.flush()
+                return response
+    raise ConnectionError('connection closed by redaql daemon.')
+
+
+def get_credentials(host, api_key):
+    """
+    identity of redash server and api key, to check that caller and daemon use the same.
+    the key is hashed, not sent over the socket as is.
+    """
+    return {
+        'host': (host or '').rstrip('/'),
+        'api_key': hashlib.sha256((api_key or '').encode('utf-8')).hexdigest(),
+    }
+
+
+def forward(argv):
+    """
+    forward batch mode invocation(-c) to the daemon.
+    :return: exit code. None if not forwardable(no daemon, options the daemon does not take,
+      or REDASH_SERVICE_URL / REDASH_API_KEY different from the daemon's).
+    """
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    parser.add_argument('-d', '--data-source-name', default=None)
+    parser.add_argument('--profile', default=os.environ.get('REDAQL_PROFILE'))
+    parser.add_argument('-c', '--command', action='append', default=[])
+    try:
+        args, unknown = parser.parse_known_args(argv)
+    except SystemExit:
+        return None
+    if unknown or not args.command:
+        return None
+    sock = connect(get_socket_path())
+    if sock is None:
+        return None
+    response = send(sock, {
+        'action': 'run',
+        'commands': args.command,
+        'data_source_name': args.data_source_name,
+        'profile': args.profile,
+        # relative paths(i.e. \\copy t to sqlite:t.db) are resolved against the caller
+        'cwd': os.getcwd(),
+        'credentials': get_credentials(os.environ.get('REDASH_SERVICE_URL'), os.environ.get('REDASH_API_KEY')),
+    }, sys.stdout)
+    if response.get('rejected'):
+        # run locally with the caller's settings
+        return None
+    return response['exit']
+
+
+class _Output:
+    """
+    stdout of a request. buffered writes are sent as json lines.
+    """
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.buffer = []
+        self.size = 0
+        self.broken = False
+
+    def write(self, text):
+        self.buffer.append(text)
+        self.size += len(text)
+        if self.size >= _OUTPUT_BUFFER_SIZE:
+            self.flush()
+        return len(text)
+
+    def flush(self):
+        if not self.buffer:
+            return
+        text = ''.join(self.buffer)
+        self.buffer = []
+        self.size = 0
+        self.send({'out': text})
+
+    def send(self, response):
+        try:
+            self.sock.sendall(json.dumps(response).encode('utf-8') + b'\n')
+        except OSError:
+            # i.e) client is piped to head
+            self.broken = True
+            raise
+
+
+class Daemon:
+    """
+    requests are served one by one on the same Redaql instance.
+    every request starts from the datasource and profile given on start up, like a new process.
+    """
+
+    def __init__(self, redaql_instance, socket_path):
+        """
+        :param redaql.command.Redaql redaql_instance:
+        """
+        self.redaql = redaql_instance
+        self.socket_path = socket_path
+        self.profile_name = redaql_instance.profile_name
+        self.data_source_name = redaql_instance.data_source_name
+        options = redaql_instance.connection_options
+        self.credentials = get_credentials(
+            options['host'] or os.environ.get('REDASH_SERVICE_URL'),
+            options['api_key'] or os.environ.get('REDASH_API_KEY'),
+        )
+        from redaql.preflight import MODE_CONFIRM, MODE_WARN
+        # nobody can answer confirm prompt of the daemon
+        if redaql_instance.preflight.mode == MODE_CONFIRM:
+            redaql_instance.preflight.mode = MODE_WARN
+        self.preflight_mode = redaql_instance.preflight.mode
+        self.started_at = time.time()
+        self.requests = 0
+        self._running = True
+
+    def serve(self):
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # the socket executes queries with the api key. only the owner can connect.
+        umask = os.umask(0o177)
+        try:
+            listener.bind(self.socket_path)
+        finally:
+            os.umask(umask)
+        listener.listen(16)
+        try:
+            while self._running:
+                conn, _ = listener.accept()
+                with conn:
+                    self._serve_connection(conn)
+        finally:
+            listener.close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def _serve_connection(self, conn):
+        conn.settimeout(constants.DAEMON_REQUEST_TIMEOUT)
+        try:
+            with conn.makefile('rb') as f:
+                line = f.readline()
+        except OSError:
+            # i.e) timed out
+            return
+        try:
+            message = json.loads(line)
+        except ValueError:
+            return
+        conn.settimeout(constants.DAEMON_OUTPUT_TIMEOUT)
+        out = _Output(conn)
+        if message.get('action') == 'run' and message.get('credentials') != self.credentials:
+            # caller has other REDASH_SERVICE_URL or REDASH_API_KEY. it runs locally.
+            try:
+                out.send({'exit': None, 'rejected': 'different redash server or api key.'})
+            except OSError:
+                pass
+            return
+        try:
+            code = self._handle(message, out)
+            out.flush()
+            out.send({'exit': code})
+        except OSError:
+            if not out.broken:
+                raise
+
+    def _handle(self, message, out):
+        action = message.get('action')
+        if action == 'status':
+            out.write(self.format_status())
+            return 0
+        if action == 'stop':
+            self._running = False
+            out.write('redaql daemon stopped.\n')
+            return 0
+        if action != 'run':
+            out.write(f'[ERROR] unknown action {action}.\n')
+            return 1
+        self.requests += 1
+        cwd = os.getcwd()
+        stdin = sys.stdin
+        # \\preflight confirm of a request cancels instead of prompting on the daemon's terminal
+        sys.stdin = io.StringIO()
+        with redirect_stdout(out):
+            try:
+                # requests are served one by one, so changing directory of the process is safe.
+                os.chdir(message.get('cwd') or cwd)
+                return self._run(message)
+            except SystemExit as e:
+                # \\q
+                return e.code or 0
+            except Exception as e:
+                if out.broken:
+                    raise
+                from redash_py.exceptions import RedashPyException
+                from redaql.exceptions import RedaqlException
+                if isinstance(e, (RedaqlException, RedashPyException)):
+                    print(f'[ERROR] {e}\n')
+                else:
+                    traceback.print_exc(file=out)
+                return 1
+            finally:
+                sys.stdin = stdin
+                os.chdir(cwd)
+                self._reset()
+
+    def _run(self, message):
+        from redaql.profiles import get_profile
+        redaql = self.redaql
+        profile_name = message.get('profile') or self.profile_name
+        data_source_name = message.get('data_source_name')
+        if data_source_name is None:
+            if profile_name == self.profile_name:
+                data_source_name = self.data_source_name
+            else:
+                data_source_name = get_profile(redaql.profiles_path, profile_name).data_source_name
+        if profile_name != redaql.profile_name:
+            redaql.switch_profile(profile_name, data_source_name)
+        elif data_source_name is None:
+            redaql.data_source_name = None
+        elif data_source_name != redaql.data_source_name:
+            redaql.execute_special_command(f'\\c {data_source_name}')
+        redaql.run_batch(message.get('commands') or [])
+        return 0
+
+    def _reset(self):
+        """ session state of a request is not carried over, except caches. """
+        from redaql.sampling import Sample
+        redaql = self.redaql
+        redaql.reset_buffer()
+        redaql.pivot_result = False
+        redaql.sample = Sample()
+        redaql.incremental_column = None
+        redaql.preflight.mode = self.preflight_mode
+        redaql.last_succeeded_query = None
+        named = list(redaql.named_results.values())
+        redaql.named_results.clear()
+        # closes spilled files of the last two results
+        redaql.set_last_result(None)
+        redaql.set_last_result(None)
+        for store in named:
+            store.close()
+
+    def format_status(self):
+        redaql = self.redaql
+        return dedent(f"""\
+        pid: {os.getpid()}
+        socket: {self.socket_path}
+        uptime: {time.time() - self.started_at:.0f}s
+        requests: {self.requests}
+        profile: {self.profile_name}
+        datasource: {self.data_source_name or '-'}
+        cached schemas: {len(redaql.schema_cache.cached_names())}
+        """)
+
+
+def start(socket_path, redaql_args, foreground=False, log_path=None):
+    """
+    :param redaql.command.Args redaql_args:
+    :return: exit code
+    """
+    sock = connect(socket_path)
+    if sock is not None:
+        sock.close()
+        print(f'[ERROR] redaql daemon is already running. socket: {socket_path}')
+        return 1
+    if os.path.exists(socket_path):
+        # left by killed daemon
+        os.unlink(socket_path)
+    if foreground:
+        _run_daemon(socket_path, redaql_args)
+        return 0
+
+    pid = os.fork()
+    if pid == 0:
+        os.setsid()
+        _redirect_output(log_path)
+        code = 0
+        try:
+            _run_daemon(socket_path, redaql_args)
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        os._exit(code)
+
+    deadline = time.time() + constants.DAEMON_START_TIMEOUT
+    while time.time() < deadline:
+        if os.waitpid(pid, os.WNOHANG) != (0, 0):
+            print(f'[ERROR] redaql daemon failed to start. see {log_path}')
+            return 1
+        sock = connect(socket_path)
+        if sock is not None:
+            sock.close()
+            print(f'redaql daemon started(pid {pid}). socket: {socket_path}')
+            return 0
+        time.sleep(0.05)
+    print(f'[ERROR] redaql daemon did not listen in {constants.DAEMON_START_TIMEOUT}s. see {log_path}')
+    return 1
+
+
+def _run_daemon(socket_path, redaql_args):
+    from redaql.command import Redaql
+    redaql = Redaql(**redaql_args.to_dict(), show_banner=False)
+    Daemon(redaql, socket_path).serve()
+
+
+def _redirect_output(log_path):
+    with open(os.devnull, 'rb') as devnull:
+        os.dup2(devnull.fileno(), sys.stdin.fileno())
+    with open(log_path or os.devnull, 'ab') as log:
+        os.dup2(log.fileno(), sys.stdout.fileno())
+        os.dup2(log.fileno(), sys.stderr.fileno())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='redaql daemon',
+        description=dedent("""
+        resident redaql process. while it is running, `redaql -c ...` is forwarded to it
+        unless options other than -c, -d and --profile are given.
+        other arguments of start are the same as redaql(i.e. -k, -s, -d, --prewarm).
+        """),
+    )
+    parser.add_argument('action', choices=ACTIONS)
+    parser.add_argument(
+        '--socket',
+        help=f'unix socket path. default REDAQL_DAEMON_SOCKET or {constants.DAEMON_SOCKET_PATH}',
+        default=None,
+    )
+    parser.add_argument('--foreground', action='store_true', help='do not detach on start.')
+    parser.add_argument('--log', help=f'log file of detached daemon. default {constants.DAEMON_LOG_PATH}')
+    args, rest = parser.parse_known_args(argv)
+    socket_path = expanduser(args.socket) if args.socket else get_socket_path()
+
+    if args.action == 'start':
+        from redaql.command import init
+        _, redaql_args = init(rest)
+        log_path = expanduser(args.log or constants.DAEMON_LOG_PATH)
+        sys.exit(start(socket_path, redaql_args, foreground=args.foreground, log_path=log_path))
+
+    if rest:
+        parser.error(f'unrecognized arguments: {" ".join(rest)}')
+    sock = connect(socket_path)
+    if sock is None:
+        print(f'redaql daemon is not running. socket: {socket_path}')
+        sys.exit(0 if args.action == 'stop' else 1)
+    sys.exit(send(sock, {'action': args.action}, sys.stdout)['exit'])
@@ -0,0 +1,116 @@
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from prettytable import PrettyTable
+from redash_py.exceptions import RedashPyException
+
+from redaql import constants
+
+# columns shown in summary
+_MAX_COLUMNS_WIDTH = 40
+
+
+def get_dashboard_queries(dashboard):
+    """
+    queries of visualization widgets in layout order. queries shared by widgets are returned once.
+    :param dict dashboard: redash dashboard
+    :return: list of redash query
+    """
+    widgets = sorted(
+        dashboard.get('widgets') or [],
+        key=lambda w: ((w.get('options') or {}).get('position', {}).get('row', 0),
+                       (w.get('options') or {}).get('position', {}).get('col', 0)),
+    )
+    queries = {}
+    for widget in widgets:
+        query = (widget.get('visualization') or {}).get('query')
+        if query and query['id'] not in queries:
+            queries[query['id']] = query
+    return list(queries.values())
+
+
+class DashboardFetcher:
+    """
+    fetch results of dashboard queries concurrently.
+    cached results are used unless refresh, and queries without cached result are executed.
+    """
+
+    def __init__(self, client, dashboard_id, refresh=False, parallelism=constants.DEFAULT_DASHBOARD_PARALLELISM):
+        """
+        :param redaql.client.RedaqlAPIClient client:
+        :param bool refresh: execute every query, with default parameter values.
+        """
+        self.client = client
+        self.dashboard_id = dashboard_id
+        self.refresh = refresh
+        self.parallelism = parallelism
+
+    def fetch(self):
+        """
+        :return: (dashboard, [summary dict, ...])
+        """
+        dashboard = self.client.get_dashboard(self.dashboard_id)
+        queries = get_dashboard_queries(dashboard)
+        if not queries:
+            return dashboard, []
+        with ThreadPoolExecutor(max_workers=self.parallelism, thread_name_prefix='redaql-dashboard') as pool:
+            summaries = list(pool.map(self._fetch_query, queries))
+        return dashboard, summaries
+
+    def _fetch_query(self, query):
+        summary = {'id': query['id'], 'name': query.get('name', '')}
+        start = time.monotonic()
+        try:
+            result_id = query.get('latest_query_data_id')
+            if result_id and not self.refresh:
+                summary['source'] = 'cached'
+                res = self.client.get_query_result(result_id)
+            else:
+                summary['source'] = 'executed'
+                res = self.client.get_query_results_by_id(
+                    query['id'],
+                    max_age=0,
+                    parameters=_get_default_parameters(query),
+                )
+            query_result = res['query_result']
+            summary.update(
+                rows=len(query_result['data']['rows']),
+                columns=[col['name'] for col in query_result['data']['columns']],
+                runtime=query_result.get('runtime'),
+                retrieved_at=query_result.get('retrieved_at'),
+            )
+        except (RedashPyException, requests.RequestException) as e:
+            # reported in the row of the query, others are still fetched
+            summary['error'] = str(e)
+        summary['elapsed'] = time.monotonic() - start
+        return summary
+
+
+def _get_default_parameters(query):
+    parameters = (query.get('options') or {}).get('parameters') or []
+    return {p['name']: p.get('value') for p in parameters}
+
+
+def format_summary(dashboard, summaries, elapsed):
+    table = PrettyTable(['query', 'name', 'rows', 'columns', 'runtime', 'time', 'result'])
+    table.align = 'l'
+    for summary in summaries:
+        if 'error' in summary:
+            table.add_row([summary['id'], summary['name'], '-', '-', '-', f'{summary["elapsed"]:.2f}s',
+                           f'error: {summary["error"]}'])
+            continue
+        columns = ', '.join(summary['columns'])
+        if len(columns) > _MAX_COLUMNS_WIDTH:
+            columns = columns[:_MAX_COLUMNS_WIDTH - 3] + '...'
+        runtime = '-' if summary['runtime'] is None else f'{summary["runtime"]:.2f}s'
+        table.add_row([
+            summary['id'], summary['name'], summary['rows'], columns, runtime,
+            f'{summary["elapsed"]:.2f}s', f'{summary["source"]} {summary["retrieved_at"] or ""}'.strip(),
+        ])
+    errors = len([s for s in summaries if 'error' in s])
+    return (
+        f'{dashboard.get("name", "")}\n{table.get_string()}\n\n'
+        f'{len(summaries)} queries({errors} errors). Time: {round(elapsed, 4)}s\n'
+    )
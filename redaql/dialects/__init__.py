@@ -0,0 +1,58 @@
+"""
+sql keywords and functions by redash datasource type.
+dialect module is imported when a datasource of the type is selected first.
+"""
+import importlib
+
+from functools import lru_cache
+
+# redash query runner type -> dialect module
+DIALECTS = {
+    'pg': 'postgres',
+    'cockroach': 'postgres',
+    'redshift': 'redshift',
+    'redshift_iam': 'redshift',
+    'mysql': 'mysql',
+    'rds_mysql': 'mysql',
+    'memsql': 'mysql',
+    'bigquery': 'bigquery',
+    'presto': 'presto',
+    'trino': 'presto',
+    'athena': 'presto',
+    'sqlite': 'sqlite',
+    'mssql': 'mssql',
+    'mssql_odbc': 'mssql',
+    'snowflake': 'snowflake',
+}
+# generic sql keywords for other sql datasources
+DEFAULT_DIALECT = 'ansi'
+# backslash escapes quote in every string literal, not only in E''
+BACKSLASH_ESCAPE_DIALECTS = ('mysql', 'bigquery')
+# # starts line comment
+HASH_COMMENT_DIALECTS = ('mysql', 'bigquery')
+
+
+def get_lexer_options(data_source_type):
+    """
+    :return: keyword arguments of StatementSplitter and iter_tokens for the datasource type.
+    """
+    dialect = DIALECTS.get(data_source_type)
+    return {
+        'backslash_escape': dialect in BACKSLASH_ESCAPE_DIALECTS,
+        'hash_comment': dialect in HASH_COMMENT_DIALECTS,
+    }
+
+
+@lru_cache(maxsize=None)
+def get_completion(data_source_type, syntax='sql'):
+    """
+    :param str data_source_type: 'type' of redash datasource. i.e) pg
+    :param str syntax: 'syntax' of redash datasource. no keywords for non sql datasource(i.e. mongodb).
+    :return: (words, meta_dict). do not modify them, they are cached.
+    """
+    if syntax != 'sql':
+        return [], {}
+    module = importlib.import_module(f'{__name__}.{DIALECTS.get(data_source_type, DEFAULT_DIALECT)}')
+    meta_dict = {word: 'function' for word in module.FUNCTIONS}
+    meta_dict.update({word: 'keyword' for word in module.KEYWORDS})
+    return list(meta_dict), meta_dict
@@ -0,0 +1,69 @@
+# google bigquery standard sql.
+from redaql.dialects.common import KEYWORDS as COMMON_KEYWORDS, FUNCTIONS as COMMON_FUNCTIONS
+
+KEYWORDS = COMMON_KEYWORDS + [
+    'QUALIFY',
+    'UNNEST',
+    'STRUCT',
+    'ARRAY',
+    'SAFE_CAST',
+    'EXCEPT',
+    'REPLACE',
+    'TABLESAMPLE',
+    'SYSTEM',
+    'PERCENT',
+    'IGNORE',
+    'RESPECT',
+    'INT64',
+    'FLOAT64',
+    'NUMERIC',
+    'BIGNUMERIC',
+    'STRING',
+    'BYTES',
+    'BOOL',
+    'DATETIME',
+    'GEOGRAPHY',
+]
+
+FUNCTIONS = COMMON_FUNCTIONS + [
+    'CURRENT_DATETIME',
+    'DATE_TRUNC',
+    'DATETIME_TRUNC',
+    'TIMESTAMP_TRUNC',
+    'DATE_DIFF',
+    'DATETIME_DIFF',
+    'TIMESTAMP_DIFF',
+    'DATE_ADD',
+    'DATE_SUB',
+    'TIMESTAMP_ADD',
+    'FORMAT_DATE',
+    'FORMAT_TIMESTAMP',
+    'PARSE_DATE',
+    'PARSE_TIMESTAMP',
+    'GENERATE_DATE_ARRAY',
+    'GENERATE_ARRAY',
+    'ARRAY_AGG',
+    'ARRAY_LENGTH',
+    'STRING_AGG',
+    'APPROX_COUNT_DISTINCT',
+    'APPROX_QUANTILES',
+    'APPROX_TOP_COUNT',
+    'COUNTIF',
+    'LOGICAL_AND',
+    'LOGICAL_OR',
+    'IFNULL',
+    'IF',
+    'SAFE_DIVIDE',
+    'REGEXP_CONTAINS',
+    'REGEXP_EXTRACT',
+    'REGEXP_REPLACE',
+    'SPLIT',
+    'STARTS_WITH',
+    'ENDS_WITH',
+    'JSON_EXTRACT',
+    'JSON_EXTRACT_SCALAR',
+    'JSON_VALUE',
+    'TO_JSON_STRING',
+    'FARM_FINGERPRINT',
+    'ANY_VALUE',
+]
@@ -0,0 +1,123 @@
+# keywords and functions shared by sql dialects.
+KEYWORDS = [
+    'ALL',
+    'AND',
+    'ANY',
+    'AS',
+    'ASC',
+    'BETWEEN',
+    'BY',
+    'CASE',
+    'CAST',
+    'CROSS',
+    'CURRENT_DATE',
+    'CURRENT_TIME',
+    'CURRENT_TIMESTAMP',
+    'DESC',
+    'DISTINCT',
+    'ELSE',
+    'END',
+    'EXCEPT',
+    'EXISTS',
+    'FALSE',
+    'FETCH',
+    'FIRST',
+    'FOLLOWING',
+    'FROM',
+    'FULL',
+    'GROUP',
+    'HAVING',
+    'IN',
+    'INNER',
+    'INTERSECT',
+    'INTERVAL',
+    'IS',
+    'JOIN',
+    'LEFT',
+    'LIKE',
+    'LIMIT',
+    'NATURAL',
+    'NOT',
+    'NULL',
+    'NULLS',
+    'OFFSET',
+    'ON',
+    'OR',
+    'ORDER',
+    'OUTER',
+    'OVER',
+    'PARTITION',
+    'PRECEDING',
+    'RANGE',
+    'RIGHT',
+    'ROWS',
+    'SELECT',
+    'THEN',
+    'TRUE',
+    'UNBOUNDED',
+    'UNION',
+    'USING',
+    'VALUES',
+    'WHEN',
+    'WHERE',
+    'WINDOW',
+    'WITH',
+    'INSERT',
+    'INTO',
+    'UPDATE',
+    'SET',
+    'DELETE',
+    'CREATE',
+    'TABLE',
+    'VIEW',
+    'DROP',
+    'ALTER',
+    'EXPLAIN',
+    'BIGINT',
+    'BOOLEAN',
+    'CHAR',
+    'DATE',
+    'DECIMAL',
+    'DOUBLE',
+    'FLOAT',
+    'INTEGER',
+    'NUMERIC',
+    'REAL',
+    'SMALLINT',
+    'TIME',
+    'TIMESTAMP',
+    'VARCHAR',
+]
+
+FUNCTIONS = [
+    'AVG',
+    'COUNT',
+    'MAX',
+    'MIN',
+    'SUM',
+    'COALESCE',
+    'NULLIF',
+    'ABS',
+    'CEIL',
+    'FLOOR',
+    'ROUND',
+    'MOD',
+    'POWER',
+    'SQRT',
+    'LOWER',
+    'UPPER',
+    'LENGTH',
+    'SUBSTRING',
+    'TRIM',
+    'REPLACE',
+    'CONCAT',
+    'EXTRACT',
+    'ROW_NUMBER',
+    'RANK',
+    'DENSE_RANK',
+    'LAG',
+    'LEAD',
+    'FIRST_VALUE',
+    'LAST_VALUE',
+    'NTILE',
+]
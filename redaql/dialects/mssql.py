@@ -0,0 +1,39 @@
+# microsoft sql server.
+from redaql.dialects.common import KEYWORDS as COMMON_KEYWORDS, FUNCTIONS as COMMON_FUNCTIONS
+
+KEYWORDS = COMMON_KEYWORDS + [
+    'TOP',
+    'NOLOCK',
+    'OUTPUT',
+    'APPLY',
+    'PIVOT',
+    'UNPIVOT',
+    'NVARCHAR',
+    'DATETIME2',
+    'BIT',
+    'UNIQUEIDENTIFIER',
+]
+
+FUNCTIONS = COMMON_FUNCTIONS + [
+    'GETDATE',
+    'GETUTCDATE',
+    'SYSDATETIME',
+    'DATEADD',
+    'DATEDIFF',
+    'DATEPART',
+    'DATENAME',
+    'EOMONTH',
+    'FORMAT',
+    'CONVERT',
+    'TRY_CAST',
+    'TRY_CONVERT',
+    'ISNULL',
+    'IIF',
+    'LEN',
+    'CHARINDEX',
+    'STRING_AGG',
+    'STRING_SPLIT',
+    'LEFT',
+    'RIGHT',
+    'NEWID',
+]
@@ -0,0 +1,73 @@
+# mysql and compatible.
+from redaql.dialects.common import KEYWORDS as COMMON_KEYWORDS, FUNCTIONS as COMMON_FUNCTIONS
+
+KEYWORDS = COMMON_KEYWORDS + [
+    'STRAIGHT_JOIN',
+    'SQL_NO_CACHE',
+    'SQL_CALC_FOUND_ROWS',
+    'FORCE',
+    'INDEX',
+    'IGNORE',
+    'USE',
+    'DUAL',
+    'REGEXP',
+    'RLIKE',
+    'DIV',
+    'XOR',
+    'SEPARATOR',
+    'SHOW',
+    'DATABASES',
+    'TABLES',
+    'COLUMNS',
+    'PROCESSLIST',
+    'STATUS',
+    'VARIABLES',
+    'DESCRIBE',
+    'DATETIME',
+    'TINYINT',
+    'MEDIUMINT',
+    'TEXT',
+    'LONGTEXT',
+    'JSON',
+    'UNSIGNED',
+]
+
+FUNCTIONS = COMMON_FUNCTIONS + [
+    'NOW',
+    'CURDATE',
+    'CURTIME',
+    'DATE_FORMAT',
+    'DATE_ADD',
+    'DATE_SUB',
+    'DATEDIFF',
+    'TIMESTAMPDIFF',
+    'STR_TO_DATE',
+    'UNIX_TIMESTAMP',
+    'FROM_UNIXTIME',
+    'YEAR',
+    'MONTH',
+    'DAY',
+    'HOUR',
+    'MINUTE',
+    'IFNULL',
+    'IF',
+    'GROUP_CONCAT',
+    'CONCAT_WS',
+    'SUBSTRING_INDEX',
+    'LEFT',
+    'RIGHT',
+    'LPAD',
+    'RPAD',
+    'INSTR',
+    'LOCATE',
+    'JSON_EXTRACT',
+    'JSON_UNQUOTE',
+    'JSON_OBJECT',
+    'JSON_ARRAYAGG',
+    'GREATEST',
+    'LEAST',
+    'RAND',
+    'MD5',
+    'FIELD',
+    'FIND_IN_SET',
+]
@@ -0,0 +1,73 @@
+# postgresql and compatible(cockroachdb).
+from redaql.dialects.common import KEYWORDS as COMMON_KEYWORDS, FUNCTIONS as COMMON_FUNCTIONS
+
+KEYWORDS = COMMON_KEYWORDS + [
+    'ILIKE',
+    'SIMILAR',
+    'LATERAL',
+    'RETURNING',
+    'MATERIALIZED',
+    'RECURSIVE',
+    'TABLESAMPLE',
+    'BERNOULLI',
+    'SYSTEM',
+    'FILTER',
+    'WITHIN',
+    'DISTINCT',
+    'ON',
+    'CONFLICT',
+    'DO',
+    'NOTHING',
+    'ANALYZE',
+    'VERBOSE',
+    'BUFFERS',
+    'JSONB',
+    'JSON',
+    'UUID',
+    'TEXT',
+    'SERIAL',
+    'BIGSERIAL',
+    'ARRAY',
+    'TIMESTAMPTZ',
+    'INET',
+]
+
+FUNCTIONS = COMMON_FUNCTIONS + [
+    'NOW',
+    'DATE_TRUNC',
+    'DATE_PART',
+    'TO_CHAR',
+    'TO_DATE',
+    'TO_TIMESTAMP',
+    'AGE',
+    'GENERATE_SERIES',
+    'STRING_AGG',
+    'ARRAY_AGG',
+    'ARRAY_LENGTH',
+    'UNNEST',
+    'JSON_AGG',
+    'JSONB_AGG',
+    'JSON_BUILD_OBJECT',
+    'JSONB_BUILD_OBJECT',
+    'JSONB_EXTRACT_PATH_TEXT',
+    'JSONB_ARRAY_ELEMENTS',
+    'REGEXP_REPLACE',
+    'REGEXP_MATCHES',
+    'SPLIT_PART',
+    'STRPOS',
+    'LEFT',
+    'RIGHT',
+    'LPAD',
+    'RPAD',
+    'GREATEST',
+    'LEAST',
+    'PERCENTILE_CONT',
+    'PERCENTILE_DISC',
+    'MODE',
+    'BOOL_AND',
+    'BOOL_OR',
+    'STDDEV',
+    'VARIANCE',
+    'RANDOM',
+    'MD5',
+]
@@ -0,0 +1,59 @@
+# presto, trino and amazon athena.
+from redaql.dialects.common import KEYWORDS as COMMON_KEYWORDS, FUNCTIONS as COMMON_FUNCTIONS
+
+KEYWORDS = COMMON_KEYWORDS + [
+    'UNNEST',
+    'CROSS',
+    'TABLESAMPLE',
+    'BERNOULLI',
+    'SYSTEM',
+    'ARRAY',
+    'MAP',
+    'ROW',
+    'VARBINARY',
+    'VARCHAR',
+    'SHOW',
+    'CATALOGS',
+    'SCHEMAS',
+    'TABLES',
+    'COLUMNS',
+    'DESCRIBE',
+]
+
+FUNCTIONS = COMMON_FUNCTIONS + [
+    'NOW',
+    'DATE_TRUNC',
+    'DATE_ADD',
+    'DATE_DIFF',
+    'DATE_FORMAT',
+    'DATE_PARSE',
+    'FROM_UNIXTIME',
+    'TO_UNIXTIME',
+    'FROM_ISO8601_TIMESTAMP',
+    'APPROX_DISTINCT',
+    'APPROX_PERCENTILE',
+    'ARBITRARY',
+    'ARRAY_AGG',
+    'ARRAY_JOIN',
+    'CARDINALITY',
+    'ELEMENT_AT',
+    'MAP_AGG',
+    'COUNT_IF',
+    'BOOL_AND',
+    'BOOL_OR',
+    'TRY',
+    'TRY_CAST',
+    'IF',
+    'REGEXP_LIKE',
+    'REGEXP_EXTRACT',
+    'REGEXP_REPLACE',
+    'SPLIT',
+    'SPLIT_PART',
+    'STRPOS',
+    'JSON_EXTRACT',
+    'JSON_EXTRACT_SCALAR',
+    'JSON_FORMAT',
+    'JSON_PARSE',
+    'GREATEST',
+    'LEAST',
+]
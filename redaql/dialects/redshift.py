@@ -0,0 +1,26 @@
+# amazon redshift. postgresql based.
+from redaql.dialects.postgres import KEYWORDS as POSTGRES_KEYWORDS, FUNCTIONS as POSTGRES_FUNCTIONS
+
+KEYWORDS = POSTGRES_KEYWORDS + [
+    'DISTKEY',
+    'SORTKEY',
+    'DISTSTYLE',
+    'ENCODE',
+    'UNLOAD',
+    'COPY',
+    'APPROXIMATE',
+]
+
+FUNCTIONS = POSTGRES_FUNCTIONS + [
+    'GETDATE',
+    'DATEADD',
+    'DATEDIFF',
+    'LISTAGG',
+    'NVL',
+    'NVL2',
+    'DECODE',
+    'CONVERT_TIMEZONE',
+    'APPROXIMATE',
+    'JSON_EXTRACT_PATH_TEXT',
+    'MEDIAN',
+]
@@ -0,0 +1,45 @@
+# snowflake.
+from redaql.dialects.common import KEYWORDS as COMMON_KEYWORDS, FUNCTIONS as COMMON_FUNCTIONS
+
+KEYWORDS = COMMON_KEYWORDS + [
+    'QUALIFY',
+    'LATERAL',
+    'FLATTEN',
+    'SAMPLE',
+    'TABLESAMPLE',
+    'BERNOULLI',
+    'ROW',
+    'BLOCK',
+    'SYSTEM',
+    'ILIKE',
+    'VARIANT',
+    'OBJECT',
+    'ARRAY',
+    'NUMBER',
+    'TIMESTAMP_NTZ',
+    'TIMESTAMP_TZ',
+]
+
+FUNCTIONS = COMMON_FUNCTIONS + [
+    'CURRENT_WAREHOUSE',
+    'DATEADD',
+    'DATEDIFF',
+    'DATE_TRUNC',
+    'TO_DATE',
+    'TO_TIMESTAMP',
+    'TO_VARCHAR',
+    'IFF',
+    'IFNULL',
+    'NVL',
+    'ZEROIFNULL',
+    'LISTAGG',
+    'ARRAY_AGG',
+    'OBJECT_CONSTRUCT',
+    'PARSE_JSON',
+    'TRY_CAST',
+    'TRY_TO_NUMBER',
+    'SPLIT_PART',
+    'REGEXP_SUBSTR',
+    'APPROX_COUNT_DISTINCT',
+    'MEDIAN',
+]
@@ -0,0 +1,33 @@
+# sqlite.
+from redaql.dialects.common import KEYWORDS as COMMON_KEYWORDS, FUNCTIONS as COMMON_FUNCTIONS
+
+KEYWORDS = COMMON_KEYWORDS + [
+    'GLOB',
+    'REGEXP',
+    'PRAGMA',
+    'ATTACH',
+    'DETACH',
+    'AUTOINCREMENT',
+    'WITHOUT',
+    'ROWID',
+    'TEXT',
+    'BLOB',
+]
+
+FUNCTIONS = COMMON_FUNCTIONS + [
+    'DATE',
+    'DATETIME',
+    'JULIANDAY',
+    'STRFTIME',
+    'IFNULL',
+    'IIF',
+    'INSTR',
+    'GROUP_CONCAT',
+    'PRINTF',
+    'RANDOM',
+    'TOTAL',
+    'TYPEOF',
+    'JSON_EXTRACT',
+    'JSON_GROUP_ARRAY',
+    'JSON_OBJECT',
+]
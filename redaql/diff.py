@@ -0,0 +1,176 @@
+import hashlib
+import json
+
+from prettytable import PrettyTable
+
+from redaql.exceptions import InvalidArgumentException
+
+# sample rows shown per kind
+MAX_EXAMPLES = 10
+
+
+class ResultDiff:
+
+    def __init__(self, key_columns, old_count, new_count):
+        self.key_columns = key_columns
+        self.old_count = old_count
+        self.new_count = new_count
+        self.added = 0
+        self.removed = 0
+        self.changed = 0
+        self.unchanged = 0
+        self.duplicate_keys = 0
+        self.missing_columns = []
+        # (kind, row index of old, row index of new)
+        self.examples = []
+        self.example_counts = {}
+
+    @property
+    def is_same(self):
+        return not (self.added or self.removed or self.changed or self.missing_columns)
+
+
+def diff_results(old, new, key_columns=None):
+    """
+    compare two results in linear time by hash join on key columns.
+    without key columns, whole rows are compared as multiset(only added and removed).
+    :param redaql.result_store.ResultStore old:
+    :param redaql.result_store.ResultStore new:
+    :param list[str] key_columns:
+    :rtype: ResultDiff
+    """
+    names = [name for name in old.column_names if name in new.column_names]
+    missing = [name for name in old.column_names + new.column_names if name not in names]
+    for key in key_columns or []:
+        if key not in names:
+            raise InvalidArgumentException(f'key column {key} is not in both results.')
+    result = ResultDiff(key_columns, len(old), len(new))
+    result.missing_columns = sorted(set(missing))
+    old_indexes = [old.column_names.index(name) for name in names]
+    new_indexes = [new.column_names.index(name) for name in names]
+    if key_columns:
+        key_indexes = [names.index(key) for key in key_columns]
+        _diff_by_key(result, old, new, old_indexes, new_indexes, key_indexes)
+    else:
+        _diff_by_row(result, old, new, old_indexes, new_indexes)
+    return result
+
+
+def _diff_by_key(result, old, new, old_indexes, new_indexes, key_indexes):
+    # build side: key -> (row index, row digest)
+    table = {}
+    for idx, row in enumerate(old.iter_rows()):
+        values = [row[i] for i in old_indexes]
+        key = _key([values[i] for i in key_indexes])
+        if key in table:
+            result.duplicate_keys += 1
+            continue
+        table[key] = (idx, _digest(values))
+    for idx, row in enumerate(new.iter_rows()):
+        values = [row[i] for i in new_indexes]
+        key = _key([values[i] for i in key_indexes])
+        entry = table.pop(key, None)
+        if entry is None:
+            result.added += 1
+            _add_example(result, 'added', None, idx)
+        elif entry[1] != _digest(values):
+            result.changed += 1
+            _add_example(result, 'changed', entry[0], idx)
+        else:
+            result.unchanged += 1
+    for old_idx, _ in table.values():
+        result.removed += 1
+        _add_example(result, 'removed', old_idx, None)
+
+
+def _diff_by_row(result, old, new, old_indexes, new_indexes):
+    # row digest -> row indexes of old
+    table = {}
+    for idx, row in enumerate(old.iter_rows()):
+        table.setdefault(_digest([row[i] for i in old_indexes]), []).append(idx)
+    for idx, row in enumerate(new.iter_rows()):
+        indexes = table.get(_digest([row[i] for i in new_indexes]))
+        if indexes:
+            indexes.pop()
+            result.unchanged += 1
+        else:
+            result.added += 1
+            _add_example(result, 'added', None, idx)
+    for indexes in table.values():
+        for old_idx in indexes:
+            result.removed += 1
+            _add_example(result, 'removed', old_idx, None)
+
+
+def _key(values):
+    """
+    typed values, so that 1, 1.0 and True are different keys.
+    """
+    key = tuple((type(value).__name__, value) for value in values)
+    try:
+        hash(key)
+    except TypeError:
+        # i.e) json array value
+        return _serialize(values)
+    return key
+
+
+def _digest(values):
+    """
+    digest of typed values. compared instead of whole rows, so that old rows are not kept.
+    """
+    return hashlib.blake2b(_serialize(values).encode('utf-8'), digest_size=16).digest()
+
+
+def _serialize(values):
+    return json.dumps([[type(value).__name__, value] for value in values], sort_keys=True, default=str)
+
+
+def _add_example(result, kind, old_idx, new_idx):
+    count = result.example_counts.get(kind, 0)
+    if count < MAX_EXAMPLES:
+        result.examples.append((kind, old_idx, new_idx))
+        result.example_counts[kind] = count + 1
+
+
+def format_diff(result: ResultDiff, old, new, old_label='old', new_label='new'):
+    """
+    :return: summary and sample rows. changed values are shown as old -> new.
+    """
+    key = ', '.join(result.key_columns) if result.key_columns else 'whole row'
+    lines = [
+        f'{old_label}: {result.old_count} rows, {new_label}: {result.new_count} rows. key: {key}',
+        f'added: {result.added}, removed: {result.removed}, changed: {result.changed}, unchanged: {result.unchanged}',
+    ]
+    if result.duplicate_keys:
+        lines.append(f'[WARN] {result.duplicate_keys} duplicate keys in {old_label} are ignored.')
+    if result.missing_columns:
+        lines.append(f'[WARN] columns not in both results: {", ".join(result.missing_columns)}')
+    if result.is_same:
+        lines.append('results are identical.')
+    if not result.examples:
+        return '\n'.join(lines) + '\n'
+
+    names = [name for name in old.column_names if name in new.column_names]
+    table = PrettyTable(['diff'] + names)
+    table.align = 'l'
+    marks = {'added': '+', 'removed': '-', 'changed': '~'}
+    for kind, old_idx, new_idx in sorted(result.examples, key=lambda e: list(marks).index(e[0])):
+        old_row = _get_row(old, old_idx, names)
+        new_row = _get_row(new, new_idx, names)
+        if kind == 'added':
+            values = new_row
+        elif kind == 'removed':
+            values = old_row
+        else:
+            values = [o if o == n else f'{o} -> {n}' for o, n in zip(old_row, new_row)]
+        table.add_row([marks[kind]] + values)
+    lines.append(table.get_string())
+    return '\n'.join(lines) + '\n'
+
+
+def _get_row(store, idx, names):
+    if idx is None:
+        return None
+    row = next(store.iter_rows(idx, idx + 1))
+    return [row[store.column_names.index(name)] for name in names]
@@ -22,3 +22,23 @@ class LatestQueryFailedException(RedaqlException):
 
 class InvalidArgumentException(RedaqlException):
     """ invalid arguments """
+
+
+class ExportFailedException(RedaqlException):
+    """ export failed """
+
+
+class PreflightRejectedException(RedaqlException):
+    """ query cancelled by preflight """
+
+
+class PartitionFailedException(RedaqlException):
+    """ some partitions failed """
+
+
+class NotFoundProfileException(RedaqlException):
+    """ invalid profile """
+
+
+class MalformedResultException(RedaqlException):
+    """ result can not be parsed """
@@ -0,0 +1,83 @@
+import itertools
+import json
+import sqlite3
+
+from redaql.exceptions import InvalidArgumentException, ExportFailedException
+
+SQLITE_PREFIX = 'sqlite:'
+# redash column type -> sqlite column type
+SQLITE_TYPES = {
+    'integer': 'INTEGER',
+    'float': 'REAL',
+    'boolean': 'INTEGER',
+    'string': 'TEXT',
+    'datetime': 'TEXT',
+    'date': 'TEXT',
+}
+BATCH_SIZE = 10000
+
+
+def parse_sqlite_target(target: str):
+    """
+    :param str target: sqlite:path/to/file.db
+    :return: database file path
+    """
+    if not target.startswith(SQLITE_PREFIX) or target == SQLITE_PREFIX:
+        raise InvalidArgumentException(f'{target} is not a valid target. use sqlite:path.db')
+    return target[len(SQLITE_PREFIX):]
+
+
+def copy_to_sqlite(result, db_path: str, table_name: str, batch_size=BATCH_SIZE):
+    """
+    bulk insert result rows into sqlite table. table is created if not exists.
+    :param redaql.result_store.ResultStore result:
+    :param str db_path:
+    :param str table_name:
+    :param int batch_size:
+    :return: inserted row count
+    """
+    conn = None
+    try:
+        conn = sqlite3.connect(db_path)
+        with conn:
+            return insert_into_sqlite(conn, result, table_name, batch_size)
+    except sqlite3.Error as e:
+        raise ExportFailedException(f'copy to {db_path} failed. {e}')
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+def insert_into_sqlite(conn, result, table_name: str, batch_size=BATCH_SIZE):
+    """
+    insert in the transaction of conn. table is created if not exists.
+    :param sqlite3.Connection conn:
+    :param redaql.result_store.ResultStore result:
+    :return: inserted row count
+    """
+    column_defs = ', '.join(
+        [f'{_quote(col["name"])} {SQLITE_TYPES.get(col.get("type"), "")}'.rstrip() for col in result.columns]
+    )
+    placeholders = ', '.join(['?'] * len(result.columns))
+    insert_sql = f'INSERT INTO {_quote(table_name)} VALUES ({placeholders})'
+
+    conn.execute(f'CREATE TABLE IF NOT EXISTS {_quote(table_name)} ({column_defs})')
+    count = 0
+    rows = (_to_sqlite_values(row) for row in result.iter_rows())
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if not batch:
+            break
+        conn.executemany(insert_sql, batch)
+        count += len(batch)
+    return count
+
+
+def _to_sqlite_values(row):
+    # json column(list, dict) can not be bound directly
+    return [json.dumps(v) if isinstance(v, (list, dict)) else v for v in row]
+
+
+def _quote(identifier: str):
+    escaped = identifier.replace('"', '""')
+    return f'"{escaped}"'
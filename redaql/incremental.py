@@ -0,0 +1,174 @@
+import hashlib
+import json
+import sqlite3
+import time
+
+from redaql import exporter
+from redaql.exceptions import InvalidArgumentException, ExportFailedException
+from redaql.result_store import ResultStoreBuilder
+from redaql.statement_splitter import iter_tokens, normalize_sql
+
+
+def is_select(sql: str):
+    words = [text.upper() for kind, text in iter_tokens(sql) if kind == 'word']
+    return bool(words) and words[0] in ('SELECT', 'WITH')
+
+
+def get_key(host, data_source_name, sql, column):
+    """
+    identity of incrementally fetched statement.
+    """
+    content = json.dumps([host, data_source_name, normalize_sql(sql), column])
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def rewrite(sql: str, column: str, mark):
+    """
+    fetch rows past the high-water mark.
+    """
+    sql = sql.strip().rstrip(';').rstrip()
+    # newline ends trailing line comment of sql
+    return f'SELECT * FROM ({sql}\n) redaql_incremental WHERE {column} > {to_literal(mark)}'
+
+
+def to_literal(value):
+    if isinstance(value, bool) or value is None:
+        raise InvalidArgumentException(f'{value} can not be used as high-water mark.')
+    if isinstance(value, (int, float)):
+        return repr(value)
+    escaped = str(value).replace("'", "''")
+    return f"'{escaped}'"
+
+
+class IncrementalStore:
+    """
+    rows of incrementally fetched statements with their high-water marks, in a local sqlite database.
+    every statement has its own table, and rows past the mark are appended to it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def get_mark(self, key):
+        """
+        :return: high-water mark. None if never fetched, or the column had no value.
+        """
+        state = self._get_state(key)
+        return state['mark'] if state else None
+
+    def append(self, key, data_source_name, sql, column, result):
+        """
+        append rows of result and advance the mark, in one transaction.
+        without previous mark, stored rows are replaced.
+        :param redaql.result_store.ResultStore result: rows past the mark
+        :return: high-water mark
+        """
+        if column not in result.column_names and result.columns:
+            raise InvalidArgumentException(f'{column} is not in the result.')
+        state = self._get_state(key)
+        mark = state['mark'] if state else None
+        new_mark = _get_max(result, column)
+        if mark is not None and (new_mark is None or new_mark <= mark):
+            new_mark = mark
+        table_name = _table_name(key)
+        conn = self._connect()
+        try:
+            with conn:
+                if mark is None:
+                    conn.execute(f'DROP TABLE IF EXISTS {table_name}')
+                if result.columns:
+                    exporter.insert_into_sqlite(conn, result, table_name)
+                conn.execute(
+                    'INSERT OR REPLACE INTO marks(key, datasource, sql, column_name, mark, columns, updated_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (key, data_source_name, sql, column, json.dumps(new_mark),
+                     json.dumps(result.columns or (state or {}).get('columns') or []), time.time()),
+                )
+        except sqlite3.Error as e:
+            raise ExportFailedException(f'append to {self.path} failed. {e}')
+        finally:
+            conn.close()
+        return new_mark
+
+    def load(self, key, spill_threshold=None, runtime=None):
+        """
+        :return: all stored rows of the statement.
+        :rtype: redaql.result_store.ResultStore
+        """
+        state = self._get_state(key)
+        columns = state['columns'] if state else []
+        builder = ResultStoreBuilder(columns, spill_threshold=spill_threshold)
+        if not columns:
+            return builder.build(runtime=runtime)
+        booleans = [idx for idx, col in enumerate(columns) if col.get('type') == 'boolean']
+        conn = self._connect()
+        try:
+            for row in conn.execute(f'SELECT * FROM {_table_name(key)}'):
+                row = list(row)
+                # stored as integer
+                for idx in booleans:
+                    if row[idx] is not None:
+                        row[idx] = bool(row[idx])
+                builder.append(row)
+        except sqlite3.OperationalError:
+            # no rows were ever stored
+            pass
+        finally:
+            conn.close()
+        return builder.build(runtime=runtime)
+
+    def clear(self):
+        """
+        drop all stored rows and marks.
+        :return: cleared statement count
+        """
+        conn = self._connect()
+        try:
+            with conn:
+                keys = [key for key, in conn.execute('SELECT key FROM marks')]
+                for key in keys:
+                    conn.execute(f'DROP TABLE IF EXISTS {_table_name(key)}')
+                conn.execute('DELETE FROM marks')
+        finally:
+            conn.close()
+        return len(keys)
+
+    def _get_state(self, key):
+        conn = self._connect()
+        try:
+            row = conn.execute('SELECT mark, columns FROM marks WHERE key = ?', (key,)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        return {'mark': json.loads(row[0]), 'columns': json.loads(row[1])}
+
+    def _connect(self):
+        try:
+            conn = sqlite3.connect(self.path)
+        except sqlite3.Error as e:
+            raise ExportFailedException(f'open {self.path} failed. {e}')
+        try:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS marks('
+                'key TEXT PRIMARY KEY, datasource TEXT, sql TEXT, column_name TEXT, mark TEXT, columns TEXT, '
+                'updated_at REAL)'
+            )
+        except sqlite3.Error as e:
+            conn.close()
+            raise ExportFailedException(f'open {self.path} failed. {e}')
+        return conn
+
+
+def _table_name(key):
+    return f'result_{key[:32]}'
+
+
+def _get_max(result, column):
+    if not result.columns:
+        return None
+    idx = result.column_names.index(column)
+    try:
+        return max((row[idx] for row in result.iter_rows() if row[idx] is not None), default=None)
+    except TypeError:
+        raise InvalidArgumentException(f'{column} has values which can not be compared.')
@@ -0,0 +1,112 @@
+import json
+
+from redaql.exceptions import InvalidArgumentException
+from redaql.result_store import ResultStoreBuilder
+
+JOIN_INNER = 'inner'
+JOIN_LEFT = 'left'
+JOIN_TYPES = (JOIN_INNER, JOIN_LEFT)
+
+
+def parse_keys(spec: str):
+    """
+    :param str spec: comma separated key columns. different names are given as left=right.
+      i.e) id or user_id=id,dt
+    :return: list of (left column, right column)
+    """
+    keys = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        left, _, right = part.partition('=')
+        keys.append((left.strip(), (right or left).strip()))
+    if not keys:
+        raise InvalidArgumentException('need key columns. i.e) id or user_id=id')
+    return keys
+
+
+def hash_join(left, right, keys, join_type=JOIN_INNER, right_name='right', spill_threshold=None, spill_dir=None):
+    """
+    join two results locally. right rows are built into a hash table and left rows are probed in order,
+    so output follows left row order. when left is smaller, only keys of left and matching right rows are kept,
+    so memory is bounded by the smaller side and its matches(and spilled output).
+    rows with null key never match, like sql.
+    :param redaql.result_store.ResultStore left:
+    :param redaql.result_store.ResultStore right:
+    :param list keys: result of parse_keys
+    :param str join_type: inner or left
+    :param str right_name: prefix of right columns which have the same name as left column.
+    :rtype: redaql.result_store.ResultStore
+    """
+    if join_type not in JOIN_TYPES:
+        raise InvalidArgumentException(f'join type must be one of {", ".join(JOIN_TYPES)}.')
+    left_keys = [_index(left, name) for name, _ in keys]
+    right_keys = [_index(right, name) for _, name in keys]
+    # right key columns of the same name are shown once
+    right_indexes = [
+        idx for idx, name in enumerate(right.column_names)
+        if not (idx in right_keys and left.column_names[left_keys[right_keys.index(idx)]] == name)
+    ]
+    columns = list(left.columns)
+    for idx in right_indexes:
+        column = dict(right.columns[idx])
+        if column['name'] in left.column_names:
+            column['name'] = f'{right_name}.{column["name"]}'
+        columns.append(column)
+
+    builder = ResultStoreBuilder(columns, spill_threshold=spill_threshold, spill_dir=spill_dir)
+    right_nulls = [None] * len(right_indexes)
+
+    def _emit(left_row, right_row):
+        if right_row is None:
+            builder.append(list(left_row) + right_nulls)
+        else:
+            builder.append(list(left_row) + [right_row[idx] for idx in right_indexes])
+
+    wanted = None
+    if len(left) < len(right):
+        # keep only right rows which can match, instead of hashing left rows
+        wanted = {key for key in (_key(row, left_keys) for row in left.iter_rows()) if key is not None}
+    table = _build(right, right_keys, wanted)
+    for left_row in left.iter_rows():
+        key = _key(left_row, left_keys)
+        right_rows = table.get(key) if key is not None else None
+        if right_rows:
+            for right_row in right_rows:
+                _emit(left_row, right_row)
+        elif join_type == JOIN_LEFT:
+            _emit(left_row, None)
+    return builder.build(runtime=0)
+
+
+def _build(store, key_indexes, wanted=None):
+    """
+    :param set wanted: keep only rows of these keys. None keeps every row.
+    :return: key -> rows. rows with null key are dropped.
+    """
+    table = {}
+    for row in store.iter_rows():
+        key = _key(row, key_indexes)
+        if key is None or (wanted is not None and key not in wanted):
+            continue
+        table.setdefault(key, []).append(row)
+    return table
+
+
+def _key(row, key_indexes):
+    values = tuple(row[idx] for idx in key_indexes)
+    if None in values:
+        return None
+    try:
+        hash(values)
+    except TypeError:
+        # i.e) json array value. tagged, so that it does not equal to a string key
+        return ('json', json.dumps(values, sort_keys=True, default=str))
+    return values
+
+
+def _index(store, name):
+    if name not in store.column_names:
+        raise InvalidArgumentException(f'{name} is not in the result. columns: {", ".join(store.column_names)}')
+    return store.column_names.index(name)
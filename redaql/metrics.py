@@ -0,0 +1,237 @@
+import bisect
+import hashlib
+import json
+import os
+import threading
+import time
+
+from collections import defaultdict
+from contextlib import contextmanager
+
+from redaql.statement_splitter import normalize_sql
+
+# seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+
+def query_hash(sql: str):
+    return hashlib.sha1(normalize_sql(sql).encode('utf-8')).hexdigest()
+
+
+class Histogram:
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """ upper bound of the bucket containing q quantile. """
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return bound
+        return float('inf')
+
+
+class Metrics:
+    """
+    session metrics.
+    every query and special command is written to metrics log as one json line,
+    and counters are dumped in prometheus text format if prometheus_path is set.
+    """
+
+    def __init__(self, log_path=None, prometheus_path=None):
+        self.log_path = log_path
+        self.prometheus_path = prometheus_path
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.counters = defaultdict(float)
+        self.histograms = defaultdict(Histogram)
+
+    def observe_http(self, method, status_code, elapsed):
+        with self._lock:
+            self.counters[('redaql_http_requests_total', (('method', method), ('status', str(status_code))))] += 1
+            self.histograms[('redaql_http_request_duration_seconds', ())].observe(elapsed)
+
+    def observe_transfer(self, wire_bytes, decoded_bytes):
+        """
+        :param int wire_bytes: response body bytes on the wire(compressed).
+        :param int decoded_bytes: response body bytes after decoding.
+        """
+        with self._lock:
+            self.counters[('redaql_http_response_bytes_total', ())] += decoded_bytes
+            self.counters[('redaql_http_wire_bytes_total', ())] += wire_bytes
+        self._local.bytes_fetched = self.thread_bytes() + decoded_bytes
+
+    def observe_cache(self, cache, hit):
+        result = 'hit' if hit else 'miss'
+        with self._lock:
+            self.counters[('redaql_cache_requests_total', (('cache', cache), ('result', result)))] += 1
+
+    def thread_bytes(self):
+        """ response bytes fetched by current thread. """
+        return getattr(self._local, 'bytes_fetched', 0)
+
+    @contextmanager
+    def track(self, kind, datasource=None, sql=None, command=None):
+        """
+        measure one query or special command. caller can fill record(rows, redash_runtime, cache).
+        :param str kind: query or special_command
+        """
+        record = {
+            'ts': time.time(),
+            'kind': kind,
+            'datasource': datasource,
+            'query_hash': query_hash(sql) if sql else None,
+            'command': command,
+            'rows': None,
+            'redash_runtime': None,
+            'cache': None,
+        }
+        start = time.monotonic()
+        bytes_start = self.thread_bytes()
+        try:
+            yield record
+            record['status'] = 'ok'
+        except SystemExit:
+            record['status'] = 'ok'
+            raise
+        except BaseException as e:
+            record['status'] = 'error'
+            record['error'] = str(e) or e.__class__.__name__
+            raise
+        finally:
+            record['wall_time'] = time.monotonic() - start
+            record['bytes_fetched'] = self.thread_bytes() - bytes_start
+            self.record(record)
+
+    def record(self, record):
+        with self._lock:
+            if record['kind'] == 'query':
+                labels = (('datasource', record['datasource'] or ''),)
+                self.counters[('redaql_queries_total', labels + (('status', record['status']),))] += 1
+                self.counters[('redaql_query_rows_total', labels)] += record['rows'] or 0
+                self.histograms[('redaql_query_duration_seconds', labels)].observe(record['wall_time'])
+            else:
+                labels = (('command', record['command'] or ''), ('status', record['status']))
+                self.counters[('redaql_special_commands_total', labels)] += 1
+        if record['cache']:
+            self.observe_cache('query', record['cache'] == 'hit')
+        if self.log_path:
+            self._write_log(record)
+        if self.prometheus_path:
+            self.dump_prometheus(self.prometheus_path)
+
+    def _write_log(self, record):
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+    def dump_prometheus(self, path):
+        """ write metrics for node_exporter textfile collector. replaced atomically. """
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+
+    def to_prometheus(self):
+        lines = []
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items(), key=lambda item: item[0])
+            typed = set()
+            for (name, labels), value in counters:
+                if name not in typed:
+                    lines.append(f'# TYPE {name} counter')
+                    typed.add(name)
+                lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+            for (name, labels), histogram in histograms:
+                if name not in typed:
+                    lines.append(f'# TYPE {name} histogram')
+                    typed.add(name)
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    bucket_labels = labels + (('le', _format_value(bound)),)
+                    lines.append(f'{name}_bucket{_format_labels(bucket_labels)} {cumulative}')
+                bucket_labels = labels + (('le', '+Inf'),)
+                lines.append(f'{name}_bucket{_format_labels(bucket_labels)} {histogram.count}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}')
+                lines.append(f'{name}_count{_format_labels(labels)} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+    def format_stats(self):
+        """ human readable summary for \\stats """
+        with self._lock:
+            counters = dict(self.counters)
+            histograms = dict(self.histograms)
+
+        def _sum(metric, **match):
+            return sum(
+                v for (name, labels), v in counters.items()
+                if name == metric and all(dict(labels).get(k) == m for k, m in match.items())
+            )
+
+        messages = []
+        queries = _sum('redaql_queries_total')
+        messages.append(f'queries: {int(queries)} (errors {int(_sum("redaql_queries_total", status="error"))})')
+        messages.append(f'special commands: {int(_sum("redaql_special_commands_total"))}')
+        http = histograms.get(('redaql_http_request_duration_seconds', ()))
+        if http and http.count:
+            messages.append(
+                f'http requests: {http.count} '
+                f'(avg {http.sum / http.count:.3f}s, p95 <= {http.quantile(0.95)}s, '
+                f'errors {int(_sum("redaql_http_requests_total") - _count_ok(counters))})'
+            )
+        decoded_bytes = _sum('redaql_http_response_bytes_total')
+        wire_bytes = _sum('redaql_http_wire_bytes_total')
+        compression = f', {1 - wire_bytes / decoded_bytes:.1%} saved' if decoded_bytes else ''
+        messages.append(f'bytes fetched: {int(decoded_bytes)} (on the wire {int(wire_bytes)}{compression})')
+        for cache in sorted({dict(labels)['cache'] for (name, labels) in counters
+                             if name == 'redaql_cache_requests_total'}):
+            hit = _sum('redaql_cache_requests_total', cache=cache, result='hit')
+            total = _sum('redaql_cache_requests_total', cache=cache)
+            messages.append(f'{cache} cache hit ratio: {hit / total:.1%} ({int(hit)}/{int(total)})')
+        for (name, labels), histogram in sorted(histograms.items()):
+            if name != 'redaql_query_duration_seconds':
+                continue
+            datasource = dict(labels)['datasource']
+            messages.append(
+                f'- {datasource}: {histogram.count} queries, '
+                f'avg {histogram.sum / histogram.count:.3f}s, p95 <= {histogram.quantile(0.95)}s'
+            )
+        return '\n'.join(messages) + '\n'
+
+
+def _count_ok(counters):
+    return sum(
+        v for (name, labels), v in counters.items()
+        if name == 'redaql_http_requests_total' and dict(labels)['status'].startswith('2')
+    )
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = [
+        (k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')) for k, v in labels
+    ]
+    return '{' + ','.join([f'{k}="{v}"' for k, v in escaped]) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
@@ -0,0 +1,197 @@
+"""
+minimal redash api server for offline testing of redaql(i.e. redaql replay --mock).
+query jobs are queued and processed by a fixed number of workers with simulated latency.
+"""
+import argparse
+import csv
+import io
+import itertools
+import json
+import queue
+import random
+import re
+import threading
+import time
+
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# redash job status
+JOB_PENDING = 1
+JOB_STARTED = 2
+JOB_SUCCESS = 3
+JOB_FAILURE = 4
+
+MOCK_VERSION = '0.0.0+mock'
+MOCK_DATA_SOURCES = [
+    {'name': 'mock', 'type': 'pg', 'syntax': 'sql', 'id': 1, 'paused': 0, 'pause_reason': None, 'view_only': False},
+]
+
+
+class MockRedashServer:
+
+    def __init__(self, host='127.0.0.1', port=0, workers=2, latency=0.05, data_sources=None):
+        """
+        :param int port: 0 is ephemeral port.
+        :param int workers: simulated redash query workers.
+        :param float latency: mean seconds of query execution(exponential distribution).
+        """
+        self.workers = workers
+        self.latency = latency
+        self.data_sources = data_sources or MOCK_DATA_SOURCES
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._results = {}
+        self._queue = queue.Queue()
+        self._httpd = ThreadingHTTPServer((host, port), _build_handler(self))
+        self._httpd.daemon_threads = True
+        self._threads = []
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f'http://{host}:{port}/'
+
+    def start(self):
+        for _ in range(self.workers):
+            self._start_thread(self._work)
+        self._start_thread(self._httpd.serve_forever)
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def serve_forever(self):
+        for _ in range(self.workers):
+            self._start_thread(self._work)
+        self._httpd.serve_forever()
+
+    def submit(self, query, data_source_id):
+        job_id = str(next(self._ids))
+        job = {'id': job_id, 'status': JOB_PENDING, 'query_result_id': None, 'error': '', 'updated_at': 0}
+        with self._lock:
+            self._jobs[job_id] = job
+        self._queue.put((job_id, query, data_source_id))
+        return dict(job)
+
+    def get_job(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def get_result(self, result_id):
+        with self._lock:
+            return self._results.get(result_id)
+
+    def _start_thread(self, target):
+        thread = threading.Thread(target=target, name='redaql-mock', daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            job_id, query, data_source_id = self._queue.get()
+            with self._lock:
+                self._jobs[job_id]['status'] = JOB_STARTED
+            runtime = random.expovariate(1 / self.latency) if self.latency else 0
+            time.sleep(runtime)
+            result_id = next(self._ids)
+            result = {
+                'query_result': {
+                    'id': result_id,
+                    'query': query,
+                    'data_source_id': data_source_id,
+                    'runtime': runtime,
+                    'retrieved_at': datetime.now(timezone.utc).isoformat(),
+                    'query_hash': '',
+                    'data': {
+                        'columns': [{'name': 'result', 'friendly_name': 'result', 'type': 'integer'}],
+                        'rows': [{'result': 1}],
+                    },
+                }
+            }
+            with self._lock:
+                self._results[result_id] = result
+                self._jobs[job_id].update(status=JOB_SUCCESS, query_result_id=result_id)
+
+
+def _build_handler(server: MockRedashServer):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            path = self.path.split('?')[0]
+            if path == '/status.json':
+                return self._send({'version': MOCK_VERSION})
+            if path == '/api/data_sources':
+                return self._send(server.data_sources)
+            match = re.match(r'^/api/data_sources/(\d+)/schema$', path)
+            if match:
+                return self._send({'schema': [{'name': 'mock_table', 'columns': ['id', 'value']}]})
+            match = re.match(r'^/api/jobs/(\w+)$', path)
+            if match:
+                job = server.get_job(match.group(1))
+                return self._send({'job': job}) if job else self._send_not_found()
+            match = re.match(r'^/api/query_results/(\d+)(\.json|\.csv)?$', path)
+            if match:
+                result = server.get_result(int(match.group(1)))
+                if not result:
+                    return self._send_not_found()
+                if match.group(2) == '.csv':
+                    return self._send_csv(result['query_result']['data'])
+                return self._send(result)
+            self._send_not_found()
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            if self.path == '/api/query_results':
+                return self._send({'job': server.submit(payload.get('query'), payload.get('data_source_id'))})
+            self._send_not_found()
+
+        def _send(self, obj, status=200):
+            body = json.dumps(obj).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_csv(self, data):
+            names = [col['name'] for col in data['columns']]
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(names)
+            for row in data['rows']:
+                writer.writerow(['' if row.get(name) is None else row.get(name) for name in names])
+            body = buf.getvalue().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/csv')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_not_found(self):
+            self._send({'message': 'not found'}, status=404)
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='minimal redash api server for testing.')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=2, help='simulated query workers.')
+    parser.add_argument('--latency', type=float, default=0.05, help='mean query seconds.')
+    args = parser.parse_args()
+    server = MockRedashServer(port=args.port, workers=args.workers, latency=args.latency)
+    print(f'mock redash server on {server.url}')
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    main()
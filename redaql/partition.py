@@ -0,0 +1,206 @@
+import datetime
+import re
+import time
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from decimal import Decimal
+
+import requests
+from redash_py.exceptions import RedashPyException
+
+from redaql import constants, dialects
+from redaql.exceptions import InvalidArgumentException, PartitionFailedException
+from redaql.result_store import ResultStoreBuilder
+from redaql.statement_splitter import StatementSplitter
+
+_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+_DATE_STEP_RE = re.compile(r'^(\d+)([dwmy]?)$')
+_NUMBER_RE = re.compile(r'^-?\d+(\.\d+)?$')
+# if statement has placeholders, bounds are embedded there instead of wrapping statement.
+START_PLACEHOLDER = '{start}'
+END_PLACEHOLDER = '{end}'
+
+
+def build_ranges(start: str, end: str, step: str):
+    """
+    split [start, end) into ranges.
+    numbers: 0 1000 100, dates: 2020-01-01 2021-01-01 1m (step unit d, w, m or y. default d)
+    :return: list of (lower, upper) sql literals
+    """
+    if _DATE_RE.match(start) and _DATE_RE.match(end):
+        return _build_date_ranges(start, end, step)
+    if _NUMBER_RE.match(start) and _NUMBER_RE.match(end) and _NUMBER_RE.match(step):
+        return _build_number_ranges(start, end, step)
+    raise InvalidArgumentException(f'invalid range {start} {end} {step}.')
+
+
+def _build_number_ranges(start, end, step):
+    # decimal keeps bounds exact. i.e) 0.1 step
+    start, end, step = Decimal(start), Decimal(end), Decimal(step)
+    if step <= 0 or start >= end:
+        raise InvalidArgumentException('step must be positive and start must be less than end.')
+    ranges = []
+    idx = 0
+    lower = start
+    while lower < end:
+        idx += 1
+        upper = min(start + step * idx, end)
+        ranges.append((str(lower), str(upper)))
+        lower = upper
+    return ranges
+
+
+def _build_date_ranges(start, end, step):
+    match = _DATE_STEP_RE.match(step)
+    if not match or int(match.group(1)) <= 0:
+        raise InvalidArgumentException(f'invalid step {step}. i.e) 7d, 2w, 1m, 1y')
+    amount, unit = int(match.group(1)), match.group(2) or 'd'
+    start = datetime.date.fromisoformat(start)
+    end = datetime.date.fromisoformat(end)
+    if start >= end:
+        raise InvalidArgumentException('start must be less than end.')
+    ranges = []
+    idx = 0
+    lower = start
+    while lower < end:
+        idx += 1
+        # computed from start, so that month end does not drift
+        upper = min(_add_date(start, amount * idx, unit), end)
+        ranges.append((f"DATE '{lower.isoformat()}'", f"DATE '{upper.isoformat()}'"))
+        lower = upper
+    return ranges
+
+
+def _add_date(date, amount, unit):
+    if unit == 'd':
+        return date + datetime.timedelta(days=amount)
+    if unit == 'w':
+        return date + datetime.timedelta(weeks=amount)
+    months = amount if unit == 'm' else amount * 12
+    month_index = date.month - 1 + months
+    year, month = date.year + month_index // 12, month_index % 12 + 1
+    # clip day for shorter month
+    for day in (date.day, 30, 29, 28):
+        try:
+            return date.replace(year=year, month=month, day=day)
+        except ValueError:
+            continue
+
+
+def _strip_terminator(sql, lexer_options):
+    """ statement without terminating semicolon and comments after it. """
+    splitter = StatementSplitter(**lexer_options)
+    # newline ends trailing line comment, extra semicolon terminates unterminated statement
+    statements = splitter.feed(f'{sql}\n;')
+    if len(statements) != 1:
+        raise InvalidArgumentException('partition needs exactly one statement.')
+    return statements[0][:-1].rstrip()
+
+
+def rewrite(sql: str, column: str, lower: str, upper: str, lexer_options=None):
+    """
+    bound statement to lower <= column < upper.
+    :param dict lexer_options: result of dialects.get_lexer_options
+    """
+    sql = _strip_terminator(sql, lexer_options or {})
+    if START_PLACEHOLDER in sql and END_PLACEHOLDER in sql:
+        return sql.replace(START_PLACEHOLDER, lower).replace(END_PLACEHOLDER, upper)
+    return (
+        # newline ends trailing line comment of sql
+        f'SELECT * FROM ({sql}\n) redaql_partition '
+        f'WHERE {column} >= {lower} AND {column} < {upper}'
+    )
+
+
+class PartitionedQuery:
+    """
+    run range bounded sub queries concurrently, and merge results in range order.
+    """
+
+    def __init__(self, client, datasource_name, sql, column, ranges,
+                 parallelism=constants.DEFAULT_PARTITION_PARALLELISM,
+                 retries=constants.DEFAULT_PARTITION_RETRIES,
+                 spill_threshold=None, progress=print):
+        """
+        :param redaql.client.RedaqlAPIClient client:
+        :param list ranges: result of build_ranges
+        :param progress: called with progress message.
+        """
+        self.client = client
+        self.datasource_name = datasource_name
+        self.sql = sql
+        self.column = column
+        self.ranges = ranges
+        self.parallelism = parallelism
+        self.retries = retries
+        self.spill_threshold = spill_threshold
+        self.progress = progress
+        self.lexer_options = {}
+
+    def execute(self):
+        """
+        :rtype: redaql.result_store.ResultStore
+        """
+        total = len(self.ranges)
+        results = [None] * total
+        failures = {}
+        pending = list(range(total))
+        data_source_type = self.client.get_data_source_by_name(self.datasource_name)['type']
+        self.lexer_options = dialects.get_lexer_options(data_source_type)
+        for attempt in range(self.retries + 1):
+            if not pending:
+                break
+            if attempt:
+                self.progress(f'retry {len(pending)} failed partitions. ({attempt}/{self.retries})')
+            failures = {}
+            pool = ThreadPoolExecutor(max_workers=self.parallelism, thread_name_prefix='redaql-partition')
+            futures = {pool.submit(self._execute_partition, idx): idx for idx in pending}
+            try:
+                for future in as_completed(futures):
+                    idx = futures[future]
+                    lower, upper = self.ranges[idx]
+                    try:
+                        results[idx], elapsed = future.result()
+                    except (RedashPyException, requests.RequestException) as e:
+                        failures[idx] = e
+                        self.progress(f'[{idx + 1}/{total}] {lower} - {upper} failed. {e}')
+                        continue
+                    row_count = len(results[idx]['data']['rows'])
+                    self.progress(f'[{idx + 1}/{total}] {lower} - {upper} {row_count} rows. {elapsed:.2f}s')
+            except KeyboardInterrupt:
+                # not started partitions are dropped, running ones are not waited.
+                for future in futures:
+                    future.cancel()
+                raise
+            finally:
+                pool.shutdown(wait=False)
+            pending = sorted(failures)
+
+        if failures:
+            ranges = ', '.join([f'{self.ranges[idx][0]} - {self.ranges[idx][1]}' for idx in sorted(failures)])
+            raise PartitionFailedException(f'{len(failures)} partitions failed. {ranges}')
+        return self._merge(results)
+
+    def _execute_partition(self, idx):
+        lower, upper = self.ranges[idx]
+        start = time.monotonic()
+        result = self.client.get_adhoc_query_result(
+            query=rewrite(self.sql, self.column, lower, upper, self.lexer_options),
+            data_source_name=self.datasource_name,
+            max_age=0,
+        )
+        return result['query_result'], time.monotonic() - start
+
+    def _merge(self, results):
+        # empty partition may have no column metadata
+        columns = next((r['data']['columns'] for r in results if r['data']['columns']), [])
+        builder = ResultStoreBuilder(columns, spill_threshold=self.spill_threshold)
+        column_names = [col['name'] for col in columns]
+        runtime = 0
+        for idx, query_result in enumerate(results):
+            runtime += query_result['runtime']
+            for row in query_result['data']['rows']:
+                builder.append([row.get(name) for name in column_names])
+            # release merged partition
+            results[idx] = None
+        return builder.build(runtime=runtime)
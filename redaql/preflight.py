@@ -0,0 +1,209 @@
+import json
+import os
+import re
+import threading
+
+from collections import defaultdict, deque
+
+from redash_py.exceptions import RedashPyException
+
+from redaql import constants
+from redaql.metrics import query_hash
+from redaql.statement_splitter import iter_tokens
+
+MODE_OFF = 'off'
+MODE_WARN = 'warn'
+MODE_CONFIRM = 'confirm'
+MODES = (MODE_OFF, MODE_WARN, MODE_CONFIRM)
+
+# datasource type -> explain output format
+EXPLAIN_FORMATS = {
+    'pg': 'postgres',
+    'redshift': 'postgres',
+    'cockroach': 'postgres',
+    'mysql': 'mysql',
+    'rds_mysql': 'mysql',
+}
+_PG_NODE_RE = re.compile(r'cost=[\d.]+\.\.([\d.]+) rows=(\d+)')
+
+
+class RuntimeHistory:
+    """
+    runtimes of past queries by server, datasource and normalized query.
+    appended to a file as json lines, and compacted when it grows.
+    """
+
+    def __init__(self, path, max_samples=constants.PREFLIGHT_HISTORY_SAMPLES,
+                 max_lines=constants.PREFLIGHT_HISTORY_MAX_LINES):
+        self.path = path
+        self.max_samples = max_samples
+        self.max_lines = max_lines
+        self._lock = threading.Lock()
+        self._runtimes = None
+        self._lines = 0
+
+    def record(self, host, datasource, sql, runtime):
+        if runtime is None:
+            return
+        key = _history_key(host, datasource, sql)
+        with self._lock:
+            self._load()
+            self._runtimes[key].append(runtime)
+            self._lines += 1
+            if self._lines > self.max_lines:
+                self._compact()
+                return
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'key': key, 'runtime': runtime}) + '\n')
+
+    def get(self, host, datasource, sql):
+        """
+        :return: recent runtimes(seconds)
+        """
+        key = _history_key(host, datasource, sql)
+        with self._lock:
+            self._load()
+            return list(self._runtimes.get(key, []))
+
+    def _load(self):
+        if self._runtimes is not None:
+            return
+        self._runtimes = defaultdict(lambda: deque(maxlen=self.max_samples))
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    self._runtimes[entry['key']].append(entry['runtime'])
+                except (ValueError, KeyError):
+                    continue
+                self._lines += 1
+
+    def _compact(self):
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        self._lines = 0
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for key, runtimes in self._runtimes.items():
+                for runtime in runtimes:
+                    f.write(json.dumps({'key': key, 'runtime': runtime}) + '\n')
+                    self._lines += 1
+        os.replace(tmp_path, self.path)
+
+
+def _has_top_level_limit(tokens):
+    """ LIMIT of subqueries or CTE does not bound the result of the statement. """
+    depth = 0
+    for kind, text in tokens:
+        if kind == 'other' and text in '()':
+            depth += 1 if text == '(' else -1
+        elif kind == 'word' and depth == 0 and text.upper() == 'LIMIT':
+            return True
+    return False
+
+
+def _history_key(host, datasource, sql):
+    # datasources of the same name on different servers are different
+    return f'{host.rstrip("/")} {datasource}:{query_hash(sql)}'
+
+
+class Preflight:
+    """
+    estimate query cost before execution,
+    from historical runtimes and EXPLAIN of the datasource.
+    """
+
+    def __init__(
+            self,
+            client,
+            history: RuntimeHistory,
+            mode=MODE_OFF,
+            max_runtime=constants.DEFAULT_PREFLIGHT_MAX_RUNTIME,
+            max_cost=None,
+            full_scan_rows=constants.DEFAULT_PREFLIGHT_FULL_SCAN_ROWS,
+    ):
+        """
+        :param redaql.client.RedaqlAPIClient client:
+        :param RuntimeHistory history:
+        :param str mode: off, warn or confirm
+        :param float max_runtime: seconds. warn if historical runtime exceeds.
+        :param float max_cost: warn if planner total cost exceeds. None is unlimited.
+        :param int full_scan_rows: warn full scan without LIMIT over this estimated rows.
+        """
+        self.client = client
+        self.history = history
+        self.mode = mode
+        self.max_runtime = max_runtime
+        self.max_cost = max_cost
+        self.full_scan_rows = full_scan_rows
+
+    @property
+    def enabled(self):
+        return self.mode != MODE_OFF
+
+    def check(self, sql, datasource):
+        """
+        :return: warning messages. empty if the query looks cheap.
+        :rtype: list[str]
+        """
+        warnings = []
+        runtimes = self.history.get(self.client.host, datasource, sql)
+        if runtimes and self.max_runtime and max(runtimes) > self.max_runtime:
+            warnings.append(
+                f'this query took {max(runtimes):.2f}s before (threshold {self.max_runtime}s).'
+            )
+        warnings += self._check_explain(sql, datasource)
+        return warnings
+
+    def _check_explain(self, sql, datasource):
+        tokens = list(iter_tokens(sql))
+        words = [text.upper() for kind, text in tokens if kind == 'word']
+        if not words or words[0] not in ('SELECT', 'WITH'):
+            return []
+        data_source_type = self.client.get_data_source_by_name(datasource)['type']
+        explain_format = EXPLAIN_FORMATS.get(data_source_type)
+        if explain_format is None:
+            return []
+        try:
+            result = self.client.get_adhoc_query_result(
+                query=f'EXPLAIN {sql}',
+                data_source_name=datasource,
+                max_age=0,
+            )
+        except RedashPyException:
+            # explain is best effort
+            return []
+        rows = result['query_result']['data']['rows']
+        is_unbounded = not _has_top_level_limit(tokens)
+        if explain_format == 'postgres':
+            return self._check_postgres_plan(rows, is_unbounded)
+        return self._check_mysql_plan(rows, is_unbounded)
+
+    def _check_postgres_plan(self, rows, is_unbounded):
+        warnings = []
+        lines = [str(next(iter(row.values()), '')) for row in rows]
+        if not lines:
+            return warnings
+        top = _PG_NODE_RE.search(lines[0])
+        if top and self.max_cost and float(top.group(1)) > self.max_cost:
+            warnings.append(f'estimated cost {float(top.group(1)):.0f} (threshold {self.max_cost:.0f}).')
+        if not is_unbounded:
+            return warnings
+        for line in lines:
+            node = _PG_NODE_RE.search(line)
+            if 'Seq Scan' in line and node and int(node.group(2)) > self.full_scan_rows:
+                table = line.split(' on ', 1)[-1].split()[0] if ' on ' in line else '?'
+                warnings.append(f'full scan on {table} without LIMIT, estimated {int(node.group(2))} rows.')
+        return warnings
+
+    def _check_mysql_plan(self, rows, is_unbounded):
+        warnings = []
+        if not is_unbounded:
+            return warnings
+        for row in rows:
+            estimated = int(row.get('rows') or 0)
+            if row.get('type') == 'ALL' and estimated > self.full_scan_rows:
+                warnings.append(
+                    f'full scan on {row.get("table")} without LIMIT, estimated {estimated} rows.'
+                )
+        return warnings
@@ -0,0 +1,68 @@
+import configparser
+import dataclasses
+import os
+
+from typing import Optional
+
+from redaql.exceptions import InvalidArgumentException, NotFoundProfileException
+
+
+@dataclasses.dataclass(frozen=True)
+class Profile:
+    """
+    redash server settings. None means command line argument(or environment variable) is used.
+    """
+    name: str
+    api_key: Optional[str] = None
+    host: Optional[str] = None
+    proxy: Optional[str] = None
+    data_source_name: Optional[str] = None
+    rate_limit: Optional[float] = None
+    max_concurrent_jobs: Optional[int] = None
+
+
+def load_profiles(path):
+    """
+    ini file. one section per server, and DEFAULT section is shared.
+
+    [production]
+    api_key = xxx
+    server_host = https://redash.example.com/
+    data_source_name = metadata
+    rate_limit = 10
+    max_concurrent_jobs = 4
+
+    :return: {name: Profile}
+    """
+    if not os.path.exists(path):
+        return {}
+    parser = configparser.ConfigParser(interpolation=None)
+    try:
+        parser.read(path, encoding='utf-8')
+        return {name: _to_profile(name, parser[name]) for name in parser.sections()}
+    except (configparser.Error, ValueError) as e:
+        raise InvalidArgumentException(f'invalid profile file {path}. {e}')
+
+
+def get_profile(path, name):
+    """
+    :rtype: Profile
+    """
+    profiles = load_profiles(path)
+    if name not in profiles:
+        raise NotFoundProfileException(f'profile {name} is not found in {path}.')
+    return profiles[name]
+
+
+def _to_profile(name, section):
+    rate_limit = section.get('rate_limit')
+    max_concurrent_jobs = section.get('max_concurrent_jobs')
+    return Profile(
+        name=name,
+        api_key=section.get('api_key'),
+        host=section.get('server_host'),
+        proxy=section.get('proxy'),
+        data_source_name=section.get('data_source_name'),
+        rate_limit=float(rate_limit) if rate_limit else None,
+        max_concurrent_jobs=int(max_concurrent_jobs) if max_concurrent_jobs else None,
+    )
@@ -1,5 +1,7 @@
-from redash_py.client import RedashAPIClient
-from prettytable import PrettyTable
+import itertools
+
+from redaql import renderer
+from redaql.api import Connection
 
 
 class QueryExecutor:
@@ -11,47 +13,32 @@ class QueryExecutor:
         self.pivot_result = pivot_result
 
     def execute_query(self):
-        client: RedashAPIClient = self.redaql_instance.client
-        result = client.get_adhoc_query_result(
-            query=self.query_string,
-            data_source_name=self.datasource_name,
-            retry_count=100000,
-            max_age=0,
+        connection: Connection = self.redaql_instance.connection
+        result = connection.execute(
+            self.query_string,
+            datasource=self.datasource_name,
         )
-        query_result = result['query_result']
-        rows = query_result['data']['rows']
-        columns = query_result['data']['columns']
-        column_names = [col['name'] for col in columns]
-        runtime = query_result['runtime']
-        results = []
-        if rows:
-            if self.pivot_result:
-                results = self._get_pivot_report(rows, column_names)
-
-            else:
-                results = self._get_pretty_report(rows, column_names)
-        if not results:
-            return 'no rows returned.\n'
-
-        return_message = f'{len(rows)} rows returned.'
-        if len(rows) == 1:
-            return_message = f'1 row returned.'
-        runtime_message = f'Time: {round(runtime, 4)}s'
-        return f'{results} \n\n{return_message}\n{runtime_message}\n'
-
-    def _get_pretty_report(self, base_data, columns):
-        table = PrettyTable(columns)
-        for row in base_data:
-            row_data = [row[col] for col in columns]
-            table.add_row(row_data)
-        return table.get_string()
-
-    def _get_pivot_report(self, base_data, columns):
-        result = ''
-        max_col_name_length = max([len(col) for col in columns])
-
-        for row in base_data:
-            result += '-' * max_col_name_length + '\n'
-            for col in columns:
-                result += f'{col.ljust(max_col_name_length)}: {row[col]}\n'
-        return result
+        self.redaql_instance.set_last_result(result.store)
+        return get_report(result.store, self.pivot_result)
+
+
+def get_report(store, pivot_result):
+    """
+    :param redaql.result_store.ResultStore store:
+    :param bool pivot_result:
+    :return: report string, or iterator of strings for spilled result.
+    """
+    row_count = len(store)
+    if row_count == 0:
+        return 'no rows returned.\n'
+
+    return_message = f'{row_count} rows returned.'
+    if row_count == 1:
+        return_message = f'1 row returned.'
+    runtime_message = f'Time: {round(store.runtime, 4)}s'
+    footer = f' \n\n{return_message}\n{runtime_message}\n'
+
+    results = renderer.render(store, pivot_result)
+    if isinstance(results, str):
+        return f'{results}{footer}'
+    return itertools.chain(results, [footer])
@@ -0,0 +1,98 @@
+import itertools
+
+from prettytable import PrettyTable
+from prompt_toolkit.utils import get_cwidth
+
+# rows rendered at once for streaming output.
+PAGE_SIZE = 1000
+
+
+def render(result, pivot_result=False):
+    """
+    :param redaql.result_store.ResultStore result:
+    :param bool pivot_result:
+    :return: rendered string. for spilled result, iterator of rendered strings.
+    """
+    columns = result.column_names
+    if result.is_spilled:
+        if pivot_result:
+            return _iter_pivot_report(result, columns)
+        return _iter_pretty_report(result, columns)
+
+    rows = result.iter_rows()
+    if pivot_result:
+        return ''.join(_iter_pivot_lines(rows, columns))
+    return _get_pretty_report(rows, columns)
+
+
+def _get_pretty_report(rows, columns):
+    table = PrettyTable(columns)
+    for row in rows:
+        table.add_row(row)
+    return table.get_string()
+
+
+def _iter_pivot_lines(rows, columns):
+    max_col_name_length = max([len(col) for col in columns])
+    labels = [col.ljust(max_col_name_length) for col in columns]
+    separator = '-' * max_col_name_length + '\n'
+    for row in rows:
+        yield separator
+        for label, value in zip(labels, row):
+            yield f'{label}: {value}\n'
+
+
+def _iter_pivot_report(result, columns):
+    lines = []
+    for line in _iter_pivot_lines(result.iter_rows(), columns):
+        lines.append(line)
+        if len(lines) >= PAGE_SIZE:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+
+def _iter_pretty_report(result, columns):
+    """
+    PrettyTable output streaming from spilled result, rendered by PrettyTable page by page.
+    first pass computes column widths, so that pages are aligned.
+    """
+    widths = [_block_width(col) for col in columns]
+    for row in result.iter_rows():
+        for idx, value in enumerate(row):
+            width = _block_width(str(value))
+            if width > widths[idx]:
+                widths[idx] = width
+    min_width = dict(zip(columns, widths))
+
+    rows = result.iter_rows()
+    page = list(itertools.islice(rows, PAGE_SIZE))
+    is_first = True
+    while True:
+        next_page = list(itertools.islice(rows, PAGE_SIZE))
+        table = PrettyTable(columns)
+        table.min_width.update(min_width)
+        for row in page:
+            table.add_row(row)
+        lines = table.get_string(header=is_first).split('\n')
+        # pages are joined into one table. drop borders between them.
+        if not is_first:
+            lines = lines[1:]
+        if not next_page:
+            yield '\n'.join(lines)
+            return
+        yield '\n'.join(lines[:-1]) + '\n'
+        page = next_page
+        is_first = False
+
+
+def _block_width(text):
+    """ width of multiline text, like PrettyTable. """
+    return max(_width(line) for line in text.split('\n'))
+
+
+def _width(text):
+    if text.isascii():
+        return len(text)
+    return get_cwidth(text)
@@ -0,0 +1,310 @@
+import argparse
+import math
+import random
+import sys
+import threading
+import time
+
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from os.path import expanduser
+from textwrap import dedent
+
+import requests
+from redash_py.exceptions import RedashPyException, SQLErrorException, TimeoutException
+
+from redaql import constants
+from redaql import utils
+from redaql.client import RedaqlAPIClient
+from redaql.statement_splitter import StatementSplitter
+
+# redash job status
+_JOB_STARTED = 2
+_JOB_FAILURE = 4
+_JOB_CANCELLED = 5
+
+
+def read_history(path):
+    """
+    statements from prompt_toolkit history file. every input line is one entry,
+    so entries are joined by statement splitter. special commands are skipped.
+    """
+    splitter = StatementSplitter()
+    statements = []
+    entry = []
+
+    def _flush():
+        if not entry:
+            return
+        text = '\n'.join(entry)
+        entry.clear()
+        if not splitter.in_literal and utils.is_special_command(text):
+            return
+        statements.extend(splitter.feed(text))
+
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.startswith('+'):
+                entry.append(line[1:].rstrip('\n'))
+            else:
+                _flush()
+    _flush()
+    return statements
+
+
+def read_sql_file(path):
+    with open(path, encoding='utf-8') as f:
+        return StatementSplitter().feed(f.read())
+
+
+class Sample:
+
+    def __init__(self, datasource, scheduled, started):
+        self.datasource = datasource
+        self.scheduled = scheduled
+        self.started = started
+        self.job_started = None
+        self.finished = None
+        self.error = None
+
+    @property
+    def client_wait(self):
+        return self.started - self.scheduled
+
+    @property
+    def queue_wait(self):
+        """ waiting time in redash queue """
+        if self.job_started is None:
+            return None
+        return self.job_started - self.started
+
+    @property
+    def latency(self):
+        return self.finished - self.started
+
+
+class Replayer:
+    """
+    replay statements against redash with concurrency and arrival rate.
+    jobs are polled directly, so that queue wait on redash can be measured.
+    """
+
+    def __init__(self, client: RedaqlAPIClient, statements, datasources, concurrency=4, rate=0.0,
+                 poisson=False, count=None, poll_interval=0.05, progress=print):
+        """
+        :param list[str] statements:
+        :param list[str] datasources: every statement is replayed against every datasource.
+        :param int concurrency: max in-flight queries.
+        :param float rate: arrivals per second. 0 sends next query as soon as a worker is free.
+        :param bool poisson: exponential inter arrival time instead of fixed interval.
+        :param int count: total queries. default is all statements once.
+        """
+        self.client = client
+        self.statements = statements
+        self.datasources = datasources
+        self.concurrency = concurrency
+        self.rate = rate
+        self.poisson = poisson
+        self.count = count or len(statements) * len(datasources)
+        self.poll_interval = poll_interval
+        self.progress = progress
+        self._data_source_ids = {}
+        self._lock = threading.Lock()
+        self._samples = []
+
+    def run(self):
+        """
+        :return: (samples, elapsed seconds)
+        """
+        for ds in self.client.get_data_sources():
+            self._data_source_ids[ds['name']] = ds['id']
+        for name in self.datasources:
+            if name not in self._data_source_ids:
+                raise RedashPyException(f'{name} is not found')
+
+        entries = [
+            (self.statements[idx // len(self.datasources) % len(self.statements)],
+             self.datasources[idx % len(self.datasources)])
+            for idx in range(self.count)
+        ]
+        begin = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='redaql-replay') as pool:
+            scheduled = begin
+            for sql, datasource in entries:
+                if self.rate:
+                    interval = random.expovariate(self.rate) if self.poisson else 1 / self.rate
+                    delay = scheduled - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                    pool.submit(self._replay, sql, datasource, scheduled)
+                    scheduled += interval
+                else:
+                    # closed loop. no client side wait
+                    pool.submit(self._replay, sql, datasource, None)
+        return self._samples, time.monotonic() - begin
+
+    def _replay(self, sql, datasource, scheduled):
+        started = time.monotonic()
+        sample = Sample(datasource, scheduled or started, started)
+        try:
+            res = self.client._post('query_results', payload={
+                'query': sql,
+                'query_id': 'adhoc',
+                'data_source_id': self._data_source_ids[datasource],
+                'max_age': 0,
+                'parameters': {},
+            })
+            if 'job' in res:
+                self._wait_job(res['job']['id'], sample)
+            else:
+                sample.job_started = time.monotonic()
+        except (RedashPyException, requests.RequestException) as e:
+            # connection errors are failed samples too
+            sample.error = str(e)
+        sample.finished = time.monotonic()
+        with self._lock:
+            self._samples.append(sample)
+            done = len(self._samples)
+        if done % max(1, self.count // 10) == 0:
+            self.progress(f'{done}/{self.count} done.')
+
+    def _wait_job(self, job_id, sample):
+        timeout = self.client.job_timeout
+        deadline = time.monotonic() + timeout if timeout else None
+        while True:
+            job = self.client._get(f'jobs/{job_id}')['job']
+            now = time.monotonic()
+            if sample.job_started is None and (job['status'] >= _JOB_STARTED or job['query_result_id']):
+                sample.job_started = now
+            if job['query_result_id']:
+                return
+            if job['status'] in (_JOB_FAILURE, _JOB_CANCELLED):
+                raise SQLErrorException(job.get('error') or 'job failed.')
+            if deadline is not None and now >= deadline:
+                # stuck job is an error sample, and does not hang the replay
+                raise TimeoutException(f'job {job_id} did not finish in {timeout}s.')
+            time.sleep(self.poll_interval)
+
+
+def percentile(values, q):
+    """ nearest rank """
+    if not values:
+        return None
+    values = sorted(values)
+    rank = max(0, min(len(values) - 1, math.ceil(q * len(values)) - 1))
+    return values[rank]
+
+
+def format_report(samples, elapsed):
+    lines = [f'{len(samples)} queries in {elapsed:.2f}s. throughput {len(samples) / elapsed:.2f} queries/s.']
+    by_datasource = defaultdict(list)
+    for sample in samples:
+        by_datasource[sample.datasource].append(sample)
+    header = f'{"datasource":<20} {"ok":>6} {"error":>6} {"qps":>7} {"wait":>8} {"queue":>8} {"p50":>8} {"p95":>8} {"p99":>8}'
+    lines.append(header)
+    for datasource, group in sorted(by_datasource.items()):
+        ok = [s for s in group if s.error is None]
+        latencies = [s.latency for s in ok]
+        queue_waits = [s.queue_wait for s in ok if s.queue_wait is not None]
+        client_waits = [s.client_wait for s in group]
+        lines.append(
+            f'{datasource:<20} {len(ok):>6} {len(group) - len(ok):>6} {len(ok) / elapsed:>7.2f} '
+            f'{_fmt(_mean(client_waits))} {_fmt(_mean(queue_waits))} '
+            f'{_fmt(percentile(latencies, 0.5))} {_fmt(percentile(latencies, 0.95))} {_fmt(percentile(latencies, 0.99))}'
+        )
+    lines.append('wait: mean client side wait(s), queue: mean redash queue wait(s), p50-p99: latency(s)')
+    errors = sorted({s.error for s in samples if s.error})
+    if errors:
+        lines.append('errors:')
+        lines += [f'- {e}' for e in errors[:10]]
+    return '\n'.join(lines)
+
+
+def _mean(values):
+    return sum(values) / len(values) if values else None
+
+
+def _fmt(value):
+    return f'{"-":>8}' if value is None else f'{value:>8.3f}'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='redaql replay',
+        description='replay recorded statements against redash and report load numbers.',
+    )
+    parser.add_argument('-k', '--api-key', help='redash api key', default=None)
+    parser.add_argument('-s', '--server-host', help='redash host i.e) https://your-redash-server/', default=None)
+    parser.add_argument('-p', '--proxy', help='proxy url', default=None)
+    parser.add_argument(
+        '-d', '--data-source-name', action='append', default=[],
+        help='datasource to replay against. can be specified multiple times.',
+    )
+    parser.add_argument('--history', help='redaql history file. default ~/.redaql.hist', default=None)
+    parser.add_argument('--sql-file', help='sql file(statements separated by semicolon).', default=None)
+    parser.add_argument('--concurrency', type=int, default=4, help='max in-flight queries.')
+    parser.add_argument(
+        '--rate', type=float, default=0.0,
+        help='arrivals per second. 0 sends next query as soon as a worker is free.',
+    )
+    parser.add_argument('--poisson', action='store_true', help='exponential inter arrival time.')
+    parser.add_argument('--count', type=int, default=None, help='total queries. default all statements once.')
+    parser.add_argument(
+        '--rate-limit', type=float, default=0,
+        help='client side rate limit of api requests per second. default unlimited.',
+    )
+    parser.add_argument(
+        '--mock', action='store_true',
+        help=dedent("""
+        replay against a local mock redash server(datasource "mock").
+        --mock-workers and --mock-latency control the server.
+        """),
+    )
+    parser.add_argument('--mock-workers', type=int, default=2)
+    parser.add_argument('--mock-latency', type=float, default=0.05)
+    args = parser.parse_args(argv)
+
+    if args.sql_file:
+        statements = read_sql_file(args.sql_file)
+    else:
+        statements = read_history(args.history or expanduser(constants.HISTORY_PATH))
+    if not statements:
+        print('[ERROR] no statements to replay.')
+        sys.exit(1)
+
+    mock = None
+    host, api_key, datasources = args.server_host, args.api_key, args.data_source_name
+    if args.mock:
+        from redaql.mock_server import MockRedashServer
+        mock = MockRedashServer(workers=args.mock_workers, latency=args.mock_latency).start()
+        host, api_key, datasources = mock.url, 'mock', datasources or ['mock']
+    if not datasources:
+        print('[ERROR] need -d datasource.')
+        sys.exit(1)
+
+    try:
+        client = RedaqlAPIClient(
+            api_key=api_key,
+            host=host,
+            proxy=args.proxy,
+            rate_limit=args.rate_limit,
+            max_concurrent_jobs=0,
+        )
+        print(f'replay {len(statements)} statements against {", ".join(datasources)}.')
+        replayer = Replayer(
+            client=client,
+            statements=statements,
+            datasources=datasources,
+            concurrency=args.concurrency,
+            rate=args.rate,
+            poisson=args.poisson,
+            count=args.count,
+        )
+        samples, elapsed = replayer.run()
+        print(format_report(samples, elapsed))
+    except RedashPyException as e:
+        print(f'[ERROR] {e}')
+        sys.exit(1)
+    finally:
+        if mock:
+            mock.stop()
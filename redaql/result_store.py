@@ -0,0 +1,277 @@
+import csv
+import itertools
+import json
+import mmap
+import re
+import struct
+import tempfile
+
+from abc import ABC, abstractmethod
+from array import array
+
+from redaql.exceptions import MalformedResultException
+
+# spilled row is stored as <length(uint32)><json encoded values>
+_LENGTH = struct.Struct('<I')
+# keep file offset of every N rows for seeking.
+_CHECKPOINT_INTERVAL = 1024
+# csv has no column types. they are inferred from first N rows.
+_CSV_SAMPLE_SIZE = 1000
+_INTEGER_RE = re.compile(r'^-?(0|[1-9]\d*)$')
+_FLOAT_RE = re.compile(r'^-?(0|[1-9]\d*)(\.\d+)?([eE][-+]?\d+)?$')
+_BOOLEANS = {'true': True, 'false': False}
+
+
+class ResultStore(ABC):
+    """
+    query result held client side.
+    rows are lists of values ordered by columns.
+    """
+
+    def __init__(self, columns, runtime=None):
+        """
+        :param list[dict] columns: redash column metadata. i.e) {'name': 'id', 'type': 'integer'}
+        :param float runtime:
+        """
+        self.columns = columns
+        self.column_names = [col['name'] for col in columns]
+        self.runtime = runtime
+
+    @property
+    def is_spilled(self):
+        return False
+
+    @abstractmethod
+    def __len__(self):
+        raise NotImplemented()
+
+    @abstractmethod
+    def iter_rows(self, start=0, stop=None):
+        raise NotImplemented()
+
+    def close(self):
+        pass
+
+
+class MemoryResultStore(ResultStore):
+
+    def __init__(self, columns, rows, runtime=None):
+        super().__init__(columns, runtime)
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    def iter_rows(self, start=0, stop=None):
+        stop = len(self.rows) if stop is None else stop
+        for idx in range(start, min(stop, len(self.rows))):
+            yield self.rows[idx]
+
+
+class SpilledResultStore(ResultStore):
+    """
+    result rows written to a temporary file and read back through mmap.
+    memory usage does not depend on row count.
+    """
+
+    def __init__(self, columns, runtime=None, spill_dir=None):
+        super().__init__(columns, runtime)
+        self._file = tempfile.TemporaryFile(prefix='redaql-', suffix='.spill', dir=spill_dir)
+        self._mmap = None
+        self._size = 0
+        self._row_count = 0
+        self._checkpoints = array('Q')
+        self._encoder = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False, default=str)
+
+    @property
+    def is_spilled(self):
+        return True
+
+    @property
+    def file_size(self):
+        return self._size
+
+    def append(self, values):
+        if self._mmap is not None:
+            raise ValueError('spilled result is already finished.')
+        if self._row_count % _CHECKPOINT_INTERVAL == 0:
+            self._checkpoints.append(self._size)
+        payload = self._encoder.encode(values).encode('utf-8')
+        self._file.write(_LENGTH.pack(len(payload)))
+        self._file.write(payload)
+        self._size += _LENGTH.size + len(payload)
+        self._row_count += 1
+
+    def finish(self):
+        self._file.flush()
+        if self._size:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self
+
+    def __len__(self):
+        return self._row_count
+
+    def iter_rows(self, start=0, stop=None):
+        if self._mmap is None:
+            return
+        stop = self._row_count if stop is None else min(stop, self._row_count)
+        if start >= stop:
+            return
+        buf = self._mmap
+        checkpoint = start // _CHECKPOINT_INTERVAL
+        offset = self._checkpoints[checkpoint]
+        idx = checkpoint * _CHECKPOINT_INTERVAL
+        unpack_from = _LENGTH.unpack_from
+        loads = json.loads
+        while idx < stop:
+            (length,) = unpack_from(buf, offset)
+            offset += _LENGTH.size
+            if idx >= start:
+                yield loads(buf[offset:offset + length])
+            offset += length
+            idx += 1
+
+    def close(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+
+class ResultStoreBuilder:
+    """
+    collect rows in memory, and spill them to file when row count exceeds spill_threshold.
+    """
+
+    def __init__(self, columns, spill_threshold=None, spill_dir=None):
+        self.columns = columns
+        self.spill_threshold = spill_threshold
+        self.spill_dir = spill_dir
+        self._rows = []
+        self._spilled = None
+
+    def append(self, values):
+        if self._spilled is not None:
+            self._spilled.append(values)
+            return
+        self._rows.append(values)
+        if self.spill_threshold and len(self._rows) > self.spill_threshold:
+            self._spilled = SpilledResultStore(self.columns, spill_dir=self.spill_dir)
+            for row in self._rows:
+                self._spilled.append(row)
+            self._rows = []
+
+    def discard(self):
+        """ drop collected rows(and spilled file) without building. """
+        if self._spilled is not None:
+            self._spilled.close()
+            self._spilled = None
+        self._rows = []
+
+    def build(self, runtime=None):
+        if self._spilled is not None:
+            store = self._spilled.finish()
+            store.runtime = runtime
+            return store
+        return MemoryResultStore(self.columns, self._rows, runtime)
+
+
+def from_query_result(query_result, spill_threshold=None, spill_dir=None):
+    """
+    rows of decoded json response. the response is already in memory as a whole,
+    so spilling bounds memory after this(rendering, later results), not peak memory of fetching.
+    use from_csv(streaming) for that.
+    :param dict query_result: 'query_result' of redash api response.
+    :param int spill_threshold: row count. if exceeded, rows are spilled to file.
+    :param str spill_dir:
+    :rtype: ResultStore
+    """
+    data = query_result['data']
+    columns = data['columns']
+    column_names = [col['name'] for col in columns]
+    rows = data['rows']
+    builder = ResultStoreBuilder(columns, spill_threshold=spill_threshold, spill_dir=spill_dir)
+    for idx, row in enumerate(rows):
+        builder.append([row.get(name) for name in column_names])
+        # release decoded dict as soon as possible
+        rows[idx] = None
+    return builder.build(runtime=query_result['runtime'])
+
+
+def from_csv(lines, runtime=None, spill_threshold=None, spill_dir=None):
+    """
+    parse redash csv download row by row.
+    empty values are None. column types are inferred from first rows.
+    :param lines: text file object(opened with newline='') or iterable of lines.
+    :param float runtime:
+    :param int spill_threshold: row count. if exceeded, rows are spilled to file.
+    :param str spill_dir:
+    :rtype: ResultStore
+    """
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return MemoryResultStore([], [], runtime)
+    sample = list(itertools.islice(reader, _CSV_SAMPLE_SIZE))
+    types = [_infer_csv_type([row[idx] for row in sample if idx < len(row)]) for idx in range(len(header))]
+    columns = [{'name': name, 'friendly_name': name, 'type': type_} for name, type_ in zip(header, types)]
+    converters = [_CSV_CONVERTERS[type_] for type_ in types]
+    builder = ResultStoreBuilder(columns, spill_threshold=spill_threshold, spill_dir=spill_dir)
+    try:
+        for row_num, row in enumerate(itertools.chain(sample, reader), 1):
+            if len(row) != len(converters):
+                raise MalformedResultException(
+                    f'csv row {row_num} has {len(row)} values, but header has {len(converters)} columns.'
+                )
+            builder.append([convert(value) for convert, value in zip(converters, row)])
+    except BaseException:
+        builder.discard()
+        raise
+    return builder.build(runtime=runtime)
+
+
+def _infer_csv_type(values):
+    values = [value for value in values if value != '']
+    if not values:
+        return 'string'
+    if all(_INTEGER_RE.match(value) for value in values):
+        return 'integer'
+    if all(_FLOAT_RE.match(value) for value in values):
+        return 'float'
+    if all(value in _BOOLEANS for value in values):
+        return 'boolean'
+    return 'string'
+
+
+def _to_integer(value):
+    if value == '':
+        return None
+    # later row may not match inferred type
+    return int(value) if _INTEGER_RE.match(value) else value
+
+
+def _to_float(value):
+    if value == '':
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def _to_boolean(value):
+    if value == '':
+        return None
+    return _BOOLEANS.get(value, value)
+
+
+def _to_string(value):
+    return None if value == '' else value
+
+
+_CSV_CONVERTERS = {
+    'integer': _to_integer,
+    'float': _to_float,
+    'boolean': _to_boolean,
+    'string': _to_string,
+}
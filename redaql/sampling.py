@@ -0,0 +1,195 @@
+import re
+
+from decimal import Decimal
+
+from redaql import dialects
+from redaql.exceptions import InvalidArgumentException
+from redaql.statement_splitter import iter_tokens
+
+MODE_OFF = 'off'
+MODE_PERCENT = 'percent'
+MODE_ROWS = 'rows'
+
+_PERCENT_RE = re.compile(r'^(\d+(\.\d+)?)%$')
+_ROWS_RE = re.compile(r'^[1-9]\d*$')
+
+# dialect -> table sample clause. placed after table alias. i.e) FROM users u TABLESAMPLE SYSTEM (10)
+TABLE_SAMPLE_CLAUSES = {
+    'postgres': 'TABLESAMPLE SYSTEM ({percent})',
+    'presto': 'TABLESAMPLE SYSTEM ({percent})',
+    'bigquery': 'TABLESAMPLE SYSTEM ({percent} PERCENT)',
+    'mssql': 'TABLESAMPLE ({percent} PERCENT)',
+    'snowflake': 'SAMPLE SYSTEM ({percent})',
+}
+# words which end table reference. i.e) FROM users WHERE ...
+_CLAUSE_WORDS = {
+    'WHERE', 'GROUP', 'ORDER', 'HAVING', 'LIMIT', 'OFFSET', 'FETCH', 'WINDOW', 'QUALIFY', 'UNION', 'EXCEPT',
+    'INTERSECT', 'JOIN', 'INNER', 'LEFT', 'RIGHT', 'FULL', 'CROSS', 'OUTER', 'NATURAL', 'LATERAL', 'ON', 'USING',
+    'TABLESAMPLE', 'SAMPLE', 'FOR', 'AS', 'WITH',
+}
+_SKIPPED = ('whitespace', 'comment')
+_IDENTIFIERS = ('word', 'quoted_identifier')
+
+
+class Sample:
+    """
+    sampling mode of \\sample.
+    """
+
+    def __init__(self, mode=MODE_OFF, value=None):
+        self.mode = mode
+        self.value = value
+
+    @classmethod
+    def parse(cls, arg):
+        """
+        :param str arg: off, percent(i.e. 10%) or row count(i.e. 1000)
+        :rtype: Sample
+        """
+        arg = arg.strip().lower()
+        if arg == MODE_OFF:
+            return cls()
+        match = _PERCENT_RE.match(arg)
+        if match:
+            percent = Decimal(match.group(1))
+            if not 0 < percent < 100:
+                raise InvalidArgumentException('percent must be between 0 and 100.')
+            return cls(MODE_PERCENT, percent)
+        if _ROWS_RE.match(arg):
+            return cls(MODE_ROWS, int(arg))
+        raise InvalidArgumentException(f'invalid sample {arg}. i.e) 10%, 1000 or off')
+
+    @property
+    def enabled(self):
+        return self.mode != MODE_OFF
+
+    def __str__(self):
+        if self.mode == MODE_PERCENT:
+            return f'{self.value}%'
+        if self.mode == MODE_ROWS:
+            return f'{self.value} rows'
+        return MODE_OFF
+
+    def rewrite(self, sql, data_source_type):
+        """
+        :return: statement with sampling. statements other than SELECT are not changed.
+        """
+        tokens = list(iter_tokens(sql.strip().rstrip(';').rstrip(), **dialects.get_lexer_options(data_source_type)))
+        words = [text.upper() for kind, text in tokens if kind == 'word']
+        if not self.enabled or not words or words[0] not in ('SELECT', 'WITH'):
+            return sql
+        dialect = dialects.DIALECTS.get(data_source_type)
+        if self.mode == MODE_ROWS:
+            body = ''.join(text for _, text in tokens)
+            # newline ends trailing line comment of body
+            if dialect == 'mssql':
+                if words[0] == 'WITH' or _has_top_level_order_by(tokens):
+                    # derived table can not have WITH nor ORDER BY(without TOP) on sql server
+                    raise InvalidArgumentException(
+                        'row count sampling of statement with WITH or ORDER BY is not supported for mssql. use TOP.'
+                    )
+                return f'SELECT TOP {self.value} * FROM ({body}\n) redaql_sample'
+            return f'SELECT * FROM ({body}\n) redaql_sample LIMIT {self.value}'
+        if dialect not in TABLE_SAMPLE_CLAUSES:
+            raise InvalidArgumentException(
+                f'percent sampling is not supported for {data_source_type}. use row count. i.e) \\sample 1000'
+            )
+        return _sample_tables(tokens, TABLE_SAMPLE_CLAUSES[dialect].format(percent=self.value))
+
+
+def _sample_tables(tokens, clause):
+    """
+    add sample clause to the first table of every FROM(subqueries too).
+    joined tables are not sampled, so that sampled rows still find their join partners.
+    references of CTE are kept.
+    """
+    cte_names = _get_cte_names(tokens)
+    out = []
+    # paren kinds. only FROM of SELECT is table reference. i.e) not EXTRACT(YEAR FROM col)
+    parens = []
+    idx = 0
+    while idx < len(tokens):
+        kind, text = tokens[idx]
+        out.append(text)
+        idx += 1
+        if kind == 'other' and text == '(':
+            following = _next(tokens, idx)
+            is_select = following is not None and tokens[following][1].upper() in ('SELECT', 'WITH')
+            parens.append(is_select)
+            continue
+        if kind == 'other' and text == ')':
+            if parens:
+                parens.pop()
+            continue
+        if kind != 'word' or text.upper() != 'FROM' or (parens and not parens[-1]):
+            continue
+        reference = _parse_table_reference(tokens, idx)
+        if reference is None or reference[0] in cte_names:
+            continue
+        _, alias_end = reference
+        out += [text for _, text in tokens[idx:alias_end]] + [f' {clause}']
+        idx = alias_end
+    return ''.join(out)
+
+
+def _parse_table_reference(tokens, idx):
+    """
+    :return: (lower cased name, end of alias). None if not a table. i.e) subquery, function
+    """
+    start = _next(tokens, idx)
+    if start is None or tokens[start][0] not in _IDENTIFIERS or tokens[start][1].upper() in _CLAUSE_WORDS:
+        return None
+    end = start + 1
+    while end + 1 < len(tokens) and tokens[end] == ('other', '.') and tokens[end + 1][0] in _IDENTIFIERS:
+        end += 2
+    following = _next(tokens, end)
+    if following is not None and tokens[following] == ('other', '('):
+        # table function
+        return None
+    name = ''.join(text for _, text in tokens[start:end]).lower()
+    alias_end = end
+    if following is not None and tokens[following][0] in _IDENTIFIERS:
+        word = tokens[following][1].upper()
+        if word == 'AS':
+            alias = _next(tokens, following + 1)
+            if alias is not None and tokens[alias][0] in _IDENTIFIERS:
+                alias_end = alias + 1
+        elif word not in _CLAUSE_WORDS:
+            alias_end = following + 1
+    sampled = _next(tokens, alias_end)
+    if sampled is not None and tokens[sampled][1].upper() in ('TABLESAMPLE', 'SAMPLE'):
+        return None
+    return name, alias_end
+
+
+def _has_top_level_order_by(tokens):
+    depth = 0
+    words = []
+    for kind, text in tokens:
+        if kind == 'other' and text in '()':
+            depth += 1 if text == '(' else -1
+        elif kind == 'word' and depth == 0:
+            words.append(text.upper())
+    return any(a == 'ORDER' and b == 'BY' for a, b in zip(words, words[1:]))
+
+
+def _get_cte_names(tokens):
+    """ names of WITH name AS ( ... ) """
+    names = set()
+    for idx, (kind, text) in enumerate(tokens):
+        if kind not in _IDENTIFIERS:
+            continue
+        as_idx = _next(tokens, idx + 1)
+        if as_idx is None or tokens[as_idx][1].upper() != 'AS':
+            continue
+        paren = _next(tokens, as_idx + 1)
+        if paren is not None and tokens[paren] == ('other', '('):
+            names.add(text.lower())
+    return names
+
+
+def _next(tokens, idx):
+    """ index of next token except whitespace and comment """
+    while idx < len(tokens) and tokens[idx][0] in _SKIPPED:
+        idx += 1
+    return idx if idx < len(tokens) else None
@@ -0,0 +1,125 @@
+import itertools
+import queue
+import threading
+
+from concurrent.futures import Future
+
+from redaql import constants
+
+
+class SchemaCache:
+    """
+    datasource schema and completion words cache.
+    schemas can be fetched in background(prewarm), and get waits for running fetch.
+    """
+
+    def __init__(self, client, max_workers=constants.DEFAULT_PREWARM_WORKERS):
+        """
+        :param redaql.client.RedaqlAPIClient client:
+        :param int max_workers: background fetch threads.
+        """
+        self.client = client
+        self.max_workers = max_workers
+        self._lock = threading.Lock()
+        self._futures = {}
+
+    def get_schema(self, data_source_name):
+        """
+        :return: [{'name': 'table', 'columns': ['col1', ...]}, ...]
+        """
+        return self._get(data_source_name)['schema']
+
+    def get_completion(self, data_source_name):
+        """
+        :return: (words, meta_dict). None if datasource does not provide schema.
+        """
+        entry = self._get(data_source_name)
+        if not entry['has_schema']:
+            return None
+        return entry['words'], entry['meta_dict']
+
+    def is_cached(self, data_source_name):
+        with self._lock:
+            future = self._futures.get(data_source_name)
+        return future is not None and future.done() and future.exception() is None
+
+    def cached_names(self):
+        with self._lock:
+            names = list(self._futures)
+        return [name for name in names if self.is_cached(name)]
+
+    def invalidate(self, data_source_name=None):
+        with self._lock:
+            if data_source_name is None:
+                self._futures.clear()
+            else:
+                self._futures.pop(data_source_name, None)
+
+    def prewarm(self, data_source_names):
+        """
+        fetch schemas in background daemon threads.
+        :param list[str] data_source_names:
+        """
+        tasks = queue.Queue()
+        with self._lock:
+            for name in data_source_names:
+                if name in self._futures:
+                    continue
+                future = Future()
+                self._futures[name] = future
+                tasks.put((name, future))
+        for _ in range(min(self.max_workers, tasks.qsize())):
+            worker = threading.Thread(target=self._work, args=(tasks,), name='redaql-prewarm', daemon=True)
+            worker.start()
+
+    def _get(self, data_source_name):
+        with self._lock:
+            future = self._futures.get(data_source_name)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._futures[data_source_name] = future
+        self.client.metrics.observe_cache('schema', not is_owner)
+        if is_owner:
+            self._load(data_source_name, future)
+        try:
+            return future.result()
+        except BaseException:
+            # do not cache failure, nor interruption(i.e. Ctrl-C while fetching)
+            with self._lock:
+                if self._futures.get(data_source_name) is future:
+                    del self._futures[data_source_name]
+            raise
+
+    def _work(self, tasks):
+        while True:
+            try:
+                name, future = tasks.get_nowait()
+            except queue.Empty:
+                return
+            self._load(name, future)
+
+    def _load(self, data_source_name, future):
+        try:
+            res = self.client.get_data_source_schema(data_source_name)
+            future.set_result(_build_entry(res))
+        except BaseException as e:
+            future.set_exception(e)
+
+
+def _build_entry(res):
+    schema = res.get('schema', [])
+    tables = [table['name'] for table in schema]
+    columns = list(
+        itertools.chain.from_iterable([table['columns'] for table in schema])
+    )
+    meta_dict = {t: 'table' for t in tables}
+    meta_dict.update(
+        {c: 'column' for c in columns}
+    )
+    return {
+        'schema': schema,
+        'has_schema': 'schema' in res,
+        'words': tables + columns,
+        'meta_dict': meta_dict,
+    }
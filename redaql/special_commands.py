@@ -1,7 +1,8 @@
 import sys
+import time
 import fnmatch
-import itertools
-from functools import lru_cache
+
+from concurrent.futures import ThreadPoolExecutor
 
 from abc import ABC, abstractmethod
 from redash_py.client import RedashAPIClient
@@ -11,10 +12,22 @@ from redaql.exceptions import (
     LatestQueryFailedException,
     InvalidArgumentException
 )
-from .query_executor import QueryExecutor
+from . import constants
+from . import dashboard
+from . import diff
+from . import join
+from . import exporter
+from . import preflight
+from . import partition
+from . import summary
+from .sampling import Sample
+from .profiles import load_profiles
+from .query_executor import QueryExecutor, get_report
 
 
 class Executor(ABC):
+    # split command options at most this times. the rest is passed as last argument(i.e. sql).
+    max_args = None
 
     def __init__(self, redaql_instance, *args):
         """
@@ -90,28 +103,50 @@ class ConnectionExecutor(Executor):
         else:
             # set datasource name
             input_ds_name = self.args[0]
-            ds_names = [ds['name'] for ds in client.get_data_sources()]
-            if input_ds_name not in ds_names:
+            data_sources = {ds['name']: ds for ds in client.get_data_sources()}
+            if input_ds_name not in data_sources:
                 raise NotFoundDataSourceException(f'{input_ds_name} is not exists.')
             self.redaql_instance.data_source_name = input_ds_name
             self.redaql_instance.reset_completer()
-            res = client.get_data_source_schema(input_ds_name)
-            if 'schema' not in res:
+            completion = self.redaql_instance.schema_cache.get_completion(input_ds_name)
+            if completion is None:
                 return
-            schemas = [schema['name'] for schema in res['schema']]
-            columns = list(
-                itertools.chain.from_iterable([schema['columns'] for schema in res['schema']])
-            )
-            meta_dict = {s: 'table' for s in schemas}
-            meta_dict.update(
-                {c: 'column' for c in columns}
-            )
+            words, meta_dict = completion
             self.redaql_instance.set_query_mode_completer(
-                schema=schemas + columns,
-                meta_dict=meta_dict
+                schema=words,
+                meta_dict=meta_dict,
+                data_source_type=data_sources[input_ds_name].get('type'),
+                syntax=data_sources[input_ds_name].get('syntax') or 'sql',
             )
 
 
+class ProfileExecutor(Executor):
+
+    @staticmethod
+    def help_text():
+        return 'SWITCH REDASH SERVER PROFILE. \\connect [profile [datasource]]'
+
+    def execute(self):
+        redaql_instance = self.redaql_instance
+        if not self.args:
+            # show profiles. * is current, + keeps connection
+            names = [constants.ARGS_PROFILE] + [
+                name for name in load_profiles(redaql_instance.profiles_path) if name != constants.ARGS_PROFILE
+            ]
+            message = ''
+            for name in names:
+                mark = '*' if name == redaql_instance.profile_name else (
+                    '+' if name in redaql_instance.connections else ' '
+                )
+                connection = redaql_instance.connections.get(name)
+                host = connection.host if connection else ''
+                message += f'{mark} {name} {host}\n'
+            return message
+        data_source_name = self.args[1] if len(self.args) > 1 else None
+        redaql_instance.switch_profile(self.args[0], data_source_name)
+        return f'connected to {self.args[0]}({redaql_instance.connection.host}).'
+
+
 class DescExecutor(Executor):
 
     @staticmethod
@@ -142,15 +177,10 @@ class DescExecutor(Executor):
                 messages += f'No Such table {table_name}'
             return messages
 
-    @lru_cache()
     def _get_schemas(self):
-        client: RedashAPIClient = self.redaql_instance.client
-        schemas = client.get_data_source_schema(
+        return self.redaql_instance.schema_cache.get_schema(
             self.redaql_instance.data_source_name
         )
-        if 'schema' not in schemas:
-            return []
-        return schemas['schema']
 
 
 class LoadExecutor(Executor):
@@ -211,12 +241,294 @@ class SaveExecutor(Executor):
         return f'query created. {self.redaql_instance.client.host}queries/{query_id}'
 
 
+class CopyExecutor(Executor):
+
+    @staticmethod
+    def help_text():
+        return 'Copy last result to local database. i.e) \\copy table_name to sqlite:path.db'
+
+    def execute(self):
+        last_result = self.redaql_instance.last_result
+        if last_result is None:
+            raise LatestQueryFailedException('The last query must be successful for copying.')
+        args = self.args
+        if len(args) != 3 or args[1].lower() != 'to':
+            raise InvalidArgumentException('usage: \\copy table_name to sqlite:path.db')
+        table_name = args[0]
+        db_path = exporter.parse_sqlite_target(args[2])
+        count = exporter.copy_to_sqlite(last_result, db_path, table_name)
+        return f'{count} rows copied to {table_name} in {db_path}.'
+
+
+class StatsExecutor(Executor):
+
+    @staticmethod
+    def help_text():
+        return 'Show session metrics.'
+
+    def execute(self):
+        return self.redaql_instance.metrics.format_stats()
+
+
+class PreflightExecutor(Executor):
+
+    @staticmethod
+    def help_text():
+        return 'Set cost preflight mode. i.e) \\preflight off|warn|confirm'
+
+    def execute(self):
+        checker = self.redaql_instance.preflight
+        if not self.args:
+            return f'preflight mode is {checker.mode}.'
+        mode = self.args[0].lower()
+        if mode not in preflight.MODES:
+            raise InvalidArgumentException(f'mode must be one of {", ".join(preflight.MODES)}.')
+        checker.mode = mode
+        return f'set preflight mode {mode}.'
+
+
+class SampleExecutor(Executor):
+
+    @staticmethod
+    def help_text():
+        return 'Set sampling of SELECT statements. i.e) \\sample 10%|1000|off'
+
+    def execute(self):
+        if self.args:
+            self.redaql_instance.sample = Sample.parse(self.args[0])
+        sample = self.redaql_instance.sample
+        if not sample.enabled:
+            return 'sample is off.'
+        return f'sample is {sample}.'
+
+
+class IncrementalExecutor(Executor):
+
+    @staticmethod
+    def help_text():
+        return 'Append rows past the high-water mark of column to local result. i.e) \\incremental col|off|reset'
+
+    def execute(self):
+        redaql_instance = self.redaql_instance
+        if self.args:
+            arg = self.args[0]
+            if arg.lower() == 'off':
+                redaql_instance.incremental_column = None
+            elif arg.lower() == 'reset':
+                count = redaql_instance.incremental_store.clear()
+                return f'{count} stored results are cleared.'
+            else:
+                redaql_instance.incremental_column = arg
+        if not redaql_instance.incremental_column:
+            return 'incremental is off.'
+        return f'incremental by {redaql_instance.incremental_column}.'
+
+
+class PartitionExecutor(Executor):
+    max_args = 4
+
+    @staticmethod
+    def help_text():
+        return 'Execute query split by range concurrently. i.e) \\partition col start end step sql'
+
+    def execute(self):
+        if len(self.args) != 5:
+            raise InvalidArgumentException(
+                'usage: \\partition col start end step sql. i.e) \\partition dt 2020-01-01 2021-01-01 1m select ...'
+            )
+        if not self.redaql_instance.data_source_name:
+            raise NotFoundDataSourceException('select datasource via \\c')
+        column, start, end, step, sql = self.args
+        ranges = partition.build_ranges(start, end, step)
+        print(f'{len(ranges)} partitions.')
+        query = partition.PartitionedQuery(
+            client=self.redaql_instance.client,
+            datasource_name=self.redaql_instance.data_source_name,
+            sql=sql,
+            column=column,
+            ranges=ranges,
+            parallelism=self.redaql_instance.partition_parallelism,
+            spill_threshold=self.redaql_instance.spill_threshold,
+        )
+        self.redaql_instance.set_last_result(None)
+        store = query.execute()
+        self.redaql_instance.set_last_result(store)
+        return get_report(store, self.redaql_instance.pivot_result)
+
+
+class DashboardExecutor(Executor):
+
+    @staticmethod
+    def help_text():
+        return 'Fetch results of dashboard queries concurrently. i.e) \\dash dashboard_id [refresh]'
+
+    def execute(self):
+        args = self.args
+        if not args or len(args) > 2 or (len(args) == 2 and args[1] != 'refresh'):
+            raise InvalidArgumentException('usage: \\dash dashboard_id [refresh]')
+        start = time.monotonic()
+        fetcher = dashboard.DashboardFetcher(
+            client=self.redaql_instance.client,
+            dashboard_id=args[0],
+            refresh=len(args) == 2,
+        )
+        dashboard_obj, summaries = fetcher.fetch()
+        if not summaries:
+            return f'dashboard {args[0]} has no queries.'
+        return dashboard.format_summary(dashboard_obj, summaries, time.monotonic() - start)
+
+
+class DiffExecutor(Executor):
+    max_args = 3
+
+    @staticmethod
+    def help_text():
+        return 'Compare the last two results, or a query on two datasources. i.e) \\diff [key[,key]] [ds1 ds2 sql]'
+
+    def execute(self):
+        args = self.args
+        if len(args) not in (0, 1, 4):
+            raise InvalidArgumentException('usage: \\diff [key[,key]] or \\diff key[,key]|* ds1 ds2 sql')
+        key_columns = None
+        if args and args[0] != '*':
+            key_columns = [key.strip() for key in args[0].split(',') if key.strip()]
+
+        redaql_instance = self.redaql_instance
+        if len(args) == 4:
+            old_label, new_label = args[1], args[2]
+            self._execute_on(args[1], args[2], args[3])
+        else:
+            old_label, new_label = 'previous', 'last'
+        old, new = redaql_instance.previous_result, redaql_instance.last_result
+        if old is None or new is None:
+            raise LatestQueryFailedException('The last two queries must be successful for diff.')
+        result = diff.diff_results(old, new, key_columns)
+        return diff.format_diff(result, old, new, old_label, new_label)
+
+    def _execute_on(self, old_data_source_name, new_data_source_name, sql):
+        """
+        execute statement on both datasources concurrently. results become previous and last result.
+        """
+        connection = self.redaql_instance.connection
+        with ThreadPoolExecutor(max_workers=2, thread_name_prefix='redaql-diff') as pool:
+            futures = [
+                pool.submit(connection.execute, sql, datasource=name)
+                for name in (old_data_source_name, new_data_source_name)
+            ]
+            results = []
+            try:
+                for future in futures:
+                    results.append(future.result())
+            except BaseException:
+                for result in results:
+                    result.close()
+                raise
+        for result in results:
+            self.redaql_instance.set_last_result(result.store)
+
+
+class AsExecutor(Executor):
+
+    @staticmethod
+    def help_text():
+        return 'Name the last result for \\join. without name, show named results. i.e) \\as name'
+
+    def execute(self):
+        redaql_instance = self.redaql_instance
+        if not self.args:
+            if not redaql_instance.named_results:
+                return 'no named results.'
+            return ''.join(
+                f'{name}: {len(store)} rows ({", ".join(store.column_names)})\n'
+                for name, store in redaql_instance.named_results.items()
+            )
+        name = self.args[0]
+        if name in RESERVED_RESULT_NAMES:
+            raise InvalidArgumentException(f'{name} is reserved.')
+        last_result = redaql_instance.last_result
+        if last_result is None:
+            raise LatestQueryFailedException('The last query must be successful for naming.')
+        replaced = redaql_instance.named_results.get(name)
+        redaql_instance.named_results[name] = last_result
+        in_use = (redaql_instance.last_result, redaql_instance.previous_result)
+        if replaced is not None and all(replaced is not result for result in in_use) \
+                and not redaql_instance.is_named_result(replaced):
+            replaced.close()
+        return f'{len(last_result)} rows are named {name}.'
+
+
+class JoinExecutor(Executor):
+
+    @staticmethod
+    def help_text():
+        return 'Hash join named results locally. i.e) \\join a b on key[,left_key=right_key] [inner|left]'
+
+    def execute(self):
+        args = self.args
+        if len(args) not in (4, 5) or args[2].lower() != 'on':
+            raise InvalidArgumentException('usage: \\join a b on key[,left_key=right_key] [inner|left]')
+        left_name, right_name = args[0], args[1]
+        left, right = _get_result(self.redaql_instance, left_name), _get_result(self.redaql_instance, right_name)
+        join_type = args[4].lower() if len(args) == 5 else join.JOIN_INNER
+        start = time.time()
+        store = join.hash_join(
+            left, right, join.parse_keys(args[3]),
+            join_type=join_type,
+            right_name=right_name,
+            spill_threshold=self.redaql_instance.spill_threshold,
+        )
+        store.runtime = time.time() - start
+        self.redaql_instance.set_last_result(store)
+        return get_report(store, self.redaql_instance.pivot_result)
+
+
+# names of \\join which refer the last two results
+RESERVED_RESULT_NAMES = ('last', 'previous')
+
+
+def _get_result(redaql_instance, name):
+    if name == 'last':
+        result = redaql_instance.last_result
+    elif name == 'previous':
+        result = redaql_instance.previous_result
+    else:
+        result = redaql_instance.named_results.get(name)
+    if result is None:
+        raise InvalidArgumentException(f'{name} is not a named result. use \\as name after a query.')
+    return result
+
+
+class SummaryExecutor(Executor):
+
+    @staticmethod
+    def help_text():
+        return 'Profile columns of the last result. nulls, distinct, min, max, mean and quantiles.'
+
+    def execute(self):
+        last_result = self.redaql_instance.last_result
+        if last_result is None:
+            raise LatestQueryFailedException('The last query must be successful for summary.')
+        return summary.format_summary(summary.summarize(last_result), len(last_result))
+
+
 SP_COMMANDS = {
     'c': ConnectionExecutor,
+    'connect': ProfileExecutor,
     'q': ExitExecutor,
     'd': DescExecutor,
     'x': PivotExecutor,
     'l': LoadExecutor,
     's': SaveExecutor,
+    'copy': CopyExecutor,
+    'stats': StatsExecutor,
+    'preflight': PreflightExecutor,
+    'sample': SampleExecutor,
+    'incremental': IncrementalExecutor,
+    'partition': PartitionExecutor,
+    'dash': DashboardExecutor,
+    'diff': DiffExecutor,
+    'as': AsExecutor,
+    'join': JoinExecutor,
+    'summary': SummaryExecutor,
     '?': HelpExecutor,
 }
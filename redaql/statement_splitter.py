@@ -0,0 +1,252 @@
+import re
+
+from functools import lru_cache
+
+# line comment of MySQL and BigQuery. it is an operator on PostgreSQL(i.e. #>>).
+COMMENT_CHR = '#'
+
+_NORMAL = 'normal'
+_SINGLE_QUOTE = 'single_quote'
+_ESCAPE_QUOTE = 'escape_quote'
+_DOUBLE_QUOTE = 'double_quote'
+_BACK_QUOTE = 'back_quote'
+_DOLLAR_QUOTE = 'dollar_quote'
+_LINE_COMMENT = 'line_comment'
+_BLOCK_COMMENT = 'block_comment'
+
+# characters which may change the lexer state in normal state.
+_SPECIAL_CHR_RE = re.compile(r"[;'\"`$\-/" + re.escape(COMMENT_CHR) + ']')
+_DOLLAR_TAG_RE = re.compile(r'\$([^\W\d]\w*)?\$')
+_IDENTIFIER_CHR_RE = re.compile(r'[\w$]')
+_SINGLE_QUOTE_RE = re.compile("'")
+# backslash escape is allowed in E'' string of PostgreSQL, and every single quote of MySQL
+_ESCAPE_QUOTE_RE = re.compile(r"['\\]")
+_DOUBLE_QUOTE_RE = re.compile('"')
+_BACK_QUOTE_RE = re.compile('`')
+
+
+class StatementSplitter:
+    """
+    incremental sql statement splitter.
+
+    feed input text (one line or pasted block) and receive completed statements.
+    lexer state (quotes, dollar quotes, comments) is kept across feed calls,
+    so every character is scanned only once.
+    """
+
+    def __init__(self, backslash_escape=False, hash_comment=False):
+        """
+        :param bool backslash_escape: backslash escapes quote in every single quote literal(i.e. MySQL).
+          otherwise only in E'' literal.
+        :param bool hash_comment: # starts line comment(i.e. MySQL).
+        """
+        self.backslash_escape = backslash_escape
+        self.hash_comment = hash_comment
+        self.reset()
+
+    def reset(self):
+        self._state = _NORMAL
+        self._dollar_tag = ''
+        self._chunks = []
+        self._has_body = False
+        self._has_content = False
+
+    @property
+    def has_pending(self):
+        """ some statement text is waiting for terminating semicolon. comments alone are not. """
+        return self._has_body
+
+    @property
+    def in_literal(self):
+        """ inside quote or comment. """
+        return self._state not in (_NORMAL, _LINE_COMMENT)
+
+    def feed(self, text: str):
+        """
+        :param str text: input text. newline is appended as line terminator.
+        :return: completed statements(with semicolon) in input order.
+        :rtype: list[str]
+        """
+        text += '\n'
+        statements = []
+        pos = 0
+        start = 0
+        length = len(text)
+        while pos < length:
+            state = self._state
+            if state == _NORMAL:
+                match = _SPECIAL_CHR_RE.search(text, pos)
+                end = match.start() if match else length
+                if not self._has_body and text[pos:end].strip():
+                    self._has_body = True
+                    self._has_content = True
+                if not match:
+                    break
+                pos = self._scan_normal(text, end)
+                if pos < 0:
+                    # semicolon
+                    pos = -pos
+                    self._chunks.append(text[start:pos])
+                    statement = self._pop_statement()
+                    if statement:
+                        statements.append(statement)
+                    start = pos
+            elif state == _SINGLE_QUOTE:
+                pos = self._scan_quote(text, pos, _SINGLE_QUOTE_RE)
+            elif state == _ESCAPE_QUOTE:
+                pos = self._scan_quote(text, pos, _ESCAPE_QUOTE_RE)
+            elif state == _DOUBLE_QUOTE:
+                pos = self._scan_quote(text, pos, _DOUBLE_QUOTE_RE)
+            elif state == _BACK_QUOTE:
+                pos = self._scan_quote(text, pos, _BACK_QUOTE_RE)
+            elif state == _DOLLAR_QUOTE:
+                pos = self._scan_until(text, pos, f'${self._dollar_tag}$')
+            elif state == _LINE_COMMENT:
+                pos = self._scan_until(text, pos, '\n')
+            elif state == _BLOCK_COMMENT:
+                pos = self._scan_until(text, pos, '*/')
+
+        rest = text[start:]
+        if self._has_content or self._state != _NORMAL:
+            self._chunks.append(rest)
+        return statements
+
+    def _scan_normal(self, text, pos):
+        """
+        handle special character at pos.
+        :return: next position. negative value means statement end.
+        """
+        char = text[pos]
+        if char == ';':
+            return -(pos + 1)
+        if char in ('-', '/') or (char == COMMENT_CHR and self.hash_comment):
+            pair = text[pos:pos + 2]
+            if pair == '--' or char == COMMENT_CHR:
+                self._state = _LINE_COMMENT
+                self._has_content = True
+                return pos + (1 if char == COMMENT_CHR else 2)
+            if pair == '/*':
+                self._state = _BLOCK_COMMENT
+                self._has_content = True
+                return pos + 2
+            self._mark_body()
+            return pos + 1
+        self._mark_body()
+        if char == "'":
+            self._state = _ESCAPE_QUOTE if self.backslash_escape or _is_escape_prefix(text, pos) else _SINGLE_QUOTE
+        elif char == '"':
+            self._state = _DOUBLE_QUOTE
+        elif char == '`':
+            self._state = _BACK_QUOTE
+        elif char == '$':
+            # $1 (placeholder) or identifier containing $ is not a dollar quote
+            if pos > 0 and _IDENTIFIER_CHR_RE.match(text, pos - 1):
+                return pos + 1
+            match = _DOLLAR_TAG_RE.match(text, pos)
+            if not match:
+                return pos + 1
+            self._state = _DOLLAR_QUOTE
+            self._dollar_tag = match.group(1) or ''
+            return match.end()
+        return pos + 1
+
+    def _scan_quote(self, text, pos, quote_re):
+        length = len(text)
+        while pos < length:
+            match = quote_re.search(text, pos)
+            if not match:
+                return length
+            idx = match.start()
+            quote = text[idx]
+            if quote == '\\':
+                pos = idx + 2
+                continue
+            # doubled quote is escaped quote
+            if text[idx + 1:idx + 2] == quote:
+                pos = idx + 2
+                continue
+            self._state = _NORMAL
+            return idx + 1
+        return length
+
+    def _scan_until(self, text, pos, terminator):
+        idx = text.find(terminator, pos)
+        if idx < 0:
+            return len(text)
+        self._state = _NORMAL
+        self._dollar_tag = ''
+        return idx + len(terminator)
+
+    def _mark_body(self):
+        self._has_body = True
+        self._has_content = True
+
+    def _pop_statement(self):
+        has_body = self._has_body
+        statement = ''.join(self._chunks).strip()
+        self._chunks = []
+        self._has_body = False
+        self._has_content = False
+        if not has_body:
+            # only comments or empty statement
+            return None
+        return statement
+
+
+def _is_escape_prefix(text, pos):
+    """ quote at pos starts E'' literal. """
+    return (
+        pos > 0 and text[pos - 1] in 'eE'
+        and not (pos > 1 and _IDENTIFIER_CHR_RE.match(text, pos - 2))
+    )
+
+
+_TOKEN_PATTERN = r"""
+    (?P<whitespace>\s+)
+    |(?P<comment>--[^\n]*|{hash_comment}/\*.*?(?:\*/|\Z))
+    |(?P<string>[eE]'(?:[^'\\]|\\.|'')*(?:'|\Z)|{single_quote})
+    |(?P<dollar_string>\$(?P<tag>(?:[^\W\d]\w*)?)\$.*?(?:\$(?P=tag)\$|\Z))
+    |(?P<quoted_identifier>"(?:[^"]|"")*(?:"|\Z)|`[^`]*(?:`|\Z))
+    |(?P<word>[^\W\d][\w$]*)
+    |(?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+)
+    |(?P<other>.)
+    """
+
+
+@lru_cache(maxsize=None)
+def _get_token_re(backslash_escape, hash_comment):
+    pattern = _TOKEN_PATTERN.replace(
+        '{single_quote}', r"'(?:[^'\\]|\\.|'')*(?:'|\Z)" if backslash_escape else r"'(?:[^']|'')*(?:'|\Z)",
+    ).replace('{hash_comment}', r'\#[^\n]*|' if hash_comment else '')
+    return re.compile(pattern, re.DOTALL | re.VERBOSE)
+
+
+def iter_tokens(sql: str, backslash_escape=False, hash_comment=False):
+    """
+    :param str sql:
+    :param bool backslash_escape: see StatementSplitter.
+    :param bool hash_comment: see StatementSplitter.
+    :return: iterator of (kind, text).
+      kind is one of whitespace, comment, string, dollar_string, quoted_identifier, word, number, other.
+    """
+    for match in _get_token_re(backslash_escape, hash_comment).finditer(sql):
+        yield match.lastgroup, match.group()
+
+
+def normalize_sql(sql: str):
+    """
+    normalize statement for identity check.
+    comments are removed, whitespaces are collapsed and trailing semicolons are removed.
+    literals are kept as is.
+    """
+    parts = []
+    for kind, text in iter_tokens(sql):
+        if kind in ('whitespace', 'comment'):
+            if parts and parts[-1] != ' ':
+                parts.append(' ')
+            continue
+        parts.append(text)
+    normalized = ''.join(parts).strip()
+    while normalized.endswith(';'):
+        normalized = normalized[:-1].rstrip()
+    return normalized
@@ -0,0 +1,167 @@
+import bisect
+import hashlib
+import itertools
+import math
+import operator
+import random
+
+from functools import partial
+from operator import itemgetter
+
+from prettytable import PrettyTable
+
+# rows processed at once. columns are summarized by builtins per chunk.
+CHUNK_SIZE = 10000
+# k of k minimum values sketch. distinct count is exact below this.
+DISTINCT_SKETCH_SIZE = 1024
+# rows sampled for quantiles
+QUANTILE_SAMPLE_SIZE = 10000
+QUANTILES = (0.25, 0.5, 0.75)
+# rendered value width
+_MAX_VALUE_WIDTH = 30
+# hashes are signed 64 bit
+_HASH_RANGE = 2 ** 64
+_HASH_OFFSET = 2 ** 63
+# mixed into hashed tuples, so that hashes are not the values themselves(hash of int is the int)
+_HASH_SALT = 'redaql.summary'
+
+_is_not_none = partial(operator.is_not, None)
+
+
+def summarize(store, sample_size=QUANTILE_SAMPLE_SIZE, chunk_size=CHUNK_SIZE):
+    """
+    profile every column in one pass with bounded memory.
+    distinct count is approximated by k minimum values sketch, and quantiles by uniformly sampled rows.
+    :param redaql.result_store.ResultStore store:
+    :return: list of dict per column
+    """
+    names = store.column_names
+    row_count = len(store)
+    sampled = sorted(random.sample(range(row_count), min(sample_size, row_count)))
+    stats = [_new_stats(name) for name in names]
+    rows = store.iter_rows()
+    offset = 0
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            break
+        samples = [
+            chunk[idx - offset]
+            for idx in sampled[bisect.bisect_left(sampled, offset):bisect.bisect_left(sampled, offset + len(chunk))]
+        ]
+        offset += len(chunk)
+        for idx, stat in enumerate(stats):
+            # column of chunk. faster than transposing by zip(*chunk).
+            getter = itemgetter(idx)
+            _update(stat, list(map(getter, chunk)), list(map(getter, samples)))
+    return [_finish(stat, row_count) for stat in stats]
+
+
+def _new_stats(name):
+    return {
+        'name': name,
+        'nulls': 0,
+        'min': None,
+        'max': None,
+        'sum': 0,
+        'numeric': True,
+        'comparable': True,
+        # k minimum hashes of values
+        'hashes': [],
+        'sample': [],
+    }
+
+
+def _update(stat, values, sample_values):
+    non_nulls = list(filter(_is_not_none, values))
+    stat['nulls'] += len(values) - len(non_nulls)
+    if not non_nulls:
+        return
+    if stat['numeric']:
+        try:
+            stat['sum'] += math.fsum(non_nulls)
+        except TypeError:
+            stat['numeric'] = False
+    if stat['comparable']:
+        try:
+            low, high = min(non_nulls), max(non_nulls)
+            stat['min'] = low if stat['min'] is None else min(stat['min'], low)
+            stat['max'] = high if stat['max'] is None else max(stat['max'], high)
+        except TypeError:
+            # i.e) json value, mixed types
+            stat['comparable'] = False
+            stat['min'] = stat['max'] = None
+    hashes = _hashes(non_nulls)
+    kept = stat['hashes']
+    if len(kept) == DISTINCT_SKETCH_SIZE:
+        # only hashes smaller than current k-th minimum can be kept
+        hashes = filter(kept[-1].__gt__, hashes)
+    stat['hashes'] = sorted(set(kept).union(hashes))[:DISTINCT_SKETCH_SIZE]
+    stat['sample'] += filter(_is_not_none, sample_values)
+
+
+def _hashes(values):
+    """
+    uniform hashes of values with their types, so that i.e) 1, 1.0 and True are distinct.
+    hash(-1) == hash(-2) in CPython, so that value == -1 is hashed too.
+    """
+    try:
+        return {hash((_HASH_SALT, type(value), value, value == -1)) for value in values}
+    except TypeError:
+        # i.e) json value. hashable values must be hashed the same as in other chunks.
+        return set(map(_hash, values))
+
+
+def _hash(value):
+    try:
+        return hash((_HASH_SALT, type(value), value, value == -1))
+    except TypeError:
+        digest = hashlib.blake2b(f'{type(value).__name__}:{value!r}'.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, 'big', signed=True)
+
+
+def _finish(stat, row_count):
+    count = row_count - stat['nulls']
+    hashes = stat['hashes']
+    if len(hashes) < DISTINCT_SKETCH_SIZE:
+        distinct = len(hashes)
+    else:
+        # (k - 1) / normalized k-th minimum hash
+        distinct = int((DISTINCT_SKETCH_SIZE - 1) / ((hashes[-1] + _HASH_OFFSET) / _HASH_RANGE))
+    is_numeric = stat['numeric'] and count > 0
+    quantiles = [None] * len(QUANTILES)
+    if is_numeric and stat['sample']:
+        sample = sorted(stat['sample'])
+        quantiles = [sample[min(len(sample) - 1, int(q * len(sample)))] for q in QUANTILES]
+    return {
+        'name': stat['name'],
+        'nulls': stat['nulls'],
+        'distinct': min(distinct, count),
+        'is_distinct_exact': len(hashes) < DISTINCT_SKETCH_SIZE,
+        'min': stat['min'],
+        'max': stat['max'],
+        'mean': stat['sum'] / count if is_numeric else None,
+        'quantiles': quantiles,
+    }
+
+
+def format_summary(summaries, row_count):
+    table = PrettyTable(['column', 'nulls', 'distinct', 'min', 'max', 'mean'] + [f'p{int(q * 100)}' for q in QUANTILES])
+    table.align = 'l'
+    for summary in summaries:
+        distinct = summary['distinct'] if summary['is_distinct_exact'] else f'~{summary["distinct"]}'
+        mean = '-' if summary['mean'] is None else f'{summary["mean"]:.6g}'
+        table.add_row(
+            [summary['name'], summary['nulls'], distinct, _format(summary['min']), _format(summary['max']), mean]
+            + [_format(q) for q in summary['quantiles']]
+        )
+    return f'{table.get_string()}\n\n{row_count} rows. ~ is approximate, quantiles are from sampled rows.\n'
+
+
+def _format(value):
+    if value is None:
+        return '-'
+    value = str(value)
+    if len(value) > _MAX_VALUE_WIDTH:
+        return value[:_MAX_VALUE_WIDTH - 3] + '...'
+    return value
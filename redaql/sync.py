@@ -0,0 +1,293 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from redash_py.exceptions import RedashPyException
+
+from redaql import constants
+from redaql.client import RedaqlAPIClient
+from redaql.exceptions import InvalidArgumentException
+
+ACTION_CREATE = 'create'
+ACTION_UPDATE = 'update'
+ACTION_UNCHANGED = 'unchanged'
+# i.e) -- datasource: metadata
+_HEADER_RE = re.compile(r'^--\s*(name|datasource|description|id)\s*:\s*(.*?)\s*$', re.IGNORECASE)
+
+
+class SqlFile:
+    """
+    a .sql file mapped to a saved query. header comments override defaults.
+    i.e)
+    -- name: active users
+    -- datasource: metadata
+    -- description: users logged in within 30 days
+    -- id: 12
+    select ...
+    """
+
+    def __init__(self, path, query, name, data_source_name, description='', query_id=None):
+        """
+        :param str path: relative path from synced directory
+        """
+        self.path = path
+        self.query = query
+        self.name = name
+        self.data_source_name = data_source_name
+        self.description = description
+        self.query_id = query_id
+
+    @classmethod
+    def load(cls, root, path, default_data_source_name=None):
+        with open(os.path.join(root, path), encoding='utf-8') as f:
+            query = f.read().strip()
+        headers = {}
+        for line in query.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            match = _HEADER_RE.match(line)
+            if not match:
+                if line.startswith('--'):
+                    continue
+                break
+            headers[match.group(1).lower()] = match.group(2)
+        query_id = headers.get('id')
+        return cls(
+            path=path,
+            query=query,
+            name=headers.get('name') or os.path.splitext(path)[0],
+            data_source_name=headers.get('datasource') or default_data_source_name,
+            description=headers.get('description', ''),
+            query_id=int(query_id) if query_id and query_id.isdigit() else None,
+        )
+
+    @property
+    def digest(self):
+        content = json.dumps([self.name, self.data_source_name, self.description, self.query])
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class Manifest:
+    """
+    synced state of a redash server. relative path -> {'id': query id, 'hash': digest of synced file}
+    query ids are of the server, so the manifest of another server is refused.
+    """
+
+    def __init__(self, path, host=None):
+        """
+        :param str host: redash server. None skips the check(i.e. dry run without server).
+        """
+        self.path = path
+        self.host = host.rstrip('/') if host else None
+        self.entries = {}
+        if not os.path.exists(path):
+            return
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data.get('queries'), dict):
+            stored_host = data.get('host')
+            self.entries = data['queries']
+        else:
+            # written before server was recorded. taken as the manifest of this server.
+            stored_host = None
+            self.entries = data
+        if stored_host and self.host and stored_host != self.host:
+            raise InvalidArgumentException(
+                f'{path} is synced with {stored_host}, not {self.host}. use --manifest for another server.'
+            )
+        self.host = self.host or stored_host
+
+    def get(self, path):
+        return self.entries.get(path) or {}
+
+    def set(self, path, query_id, digest):
+        self.entries[path] = {'id': query_id, 'hash': digest}
+
+    def save(self):
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'host': self.host, 'queries': self.entries}, f, indent=2, sort_keys=True)
+            f.write('\n')
+        os.replace(tmp_path, self.path)
+
+
+def find_sql_files(root):
+    """
+    :return: relative paths of .sql files under root, sorted.
+    """
+    paths = []
+    for dir_path, dir_names, file_names in os.walk(root):
+        dir_names[:] = sorted(name for name in dir_names if not name.startswith('.'))
+        for name in file_names:
+            if name.endswith('.sql'):
+                paths.append(os.path.relpath(os.path.join(dir_path, name), root))
+    return sorted(paths)
+
+
+def plan(files, manifest, force=False):
+    """
+    :param list[SqlFile] files:
+    :param Manifest manifest:
+    :param bool force: update unchanged queries too.
+    :return: list of (action, SqlFile, query id)
+    """
+    actions = []
+    for sql_file in files:
+        entry = manifest.get(sql_file.path)
+        query_id = sql_file.query_id or entry.get('id')
+        if query_id is None:
+            actions.append((ACTION_CREATE, sql_file, None))
+        elif force or entry.get('hash') != sql_file.digest or entry.get('id') != query_id:
+            actions.append((ACTION_UPDATE, sql_file, query_id))
+        else:
+            actions.append((ACTION_UNCHANGED, sql_file, query_id))
+    return actions
+
+
+class Syncer:
+    """
+    create or update saved queries of changed files concurrently.
+    manifest is saved even if some of them failed, so that they are retried next time.
+    """
+
+    def __init__(self, client: RedaqlAPIClient, manifest: Manifest, parallelism=constants.DEFAULT_SYNC_PARALLELISM,
+                 progress=print):
+        self.client = client
+        self.manifest = manifest
+        self.parallelism = parallelism
+        self.progress = progress
+
+    def sync(self, actions):
+        """
+        :return: {action: count}, errors
+        """
+        counts = {ACTION_CREATE: 0, ACTION_UPDATE: 0, ACTION_UNCHANGED: 0}
+        errors = []
+        changes = [(action, sql_file, query_id) for action, sql_file, query_id in actions if action != ACTION_UNCHANGED]
+        counts[ACTION_UNCHANGED] = len(actions) - len(changes)
+        if not changes:
+            return counts, errors
+        # datasource registry is loaded once, before concurrent requests.
+        self.client.get_data_sources()
+        with ThreadPoolExecutor(max_workers=self.parallelism, thread_name_prefix='redaql-sync') as pool:
+            futures = [(action, sql_file, pool.submit(self._apply, action, sql_file, query_id))
+                       for action, sql_file, query_id in changes]
+            try:
+                for action, sql_file, future in futures:
+                    try:
+                        query_id = future.result()
+                    except (RedashPyException, requests.RequestException, ValueError) as e:
+                        errors.append((sql_file.path, e))
+                        self.progress(f'[ERROR] {sql_file.path}: {e}')
+                        continue
+                    counts[action] += 1
+                    self.manifest.set(sql_file.path, query_id, sql_file.digest)
+                    self.progress(f'{action}d {sql_file.path} -> {self.client.host.rstrip("/")}/queries/{query_id}')
+            finally:
+                self.manifest.save()
+        return counts, errors
+
+    def _apply(self, action, sql_file: SqlFile, query_id):
+        if not sql_file.data_source_name:
+            raise ValueError('no datasource. use "-- datasource: name" header or -d.')
+        if action == ACTION_CREATE:
+            response = self.client.create_query(
+                name=sql_file.name,
+                data_source_name=sql_file.data_source_name,
+                query=sql_file.query,
+                description=sql_file.description,
+            )
+            return response['id']
+        self.client.update_query(
+            query_id=query_id,
+            name=sql_file.name,
+            data_source_name=sql_file.data_source_name,
+            query=sql_file.query,
+            description=sql_file.description,
+        )
+        return query_id
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='redaql sync',
+        description='create or update saved queries from .sql files. only changed files are synced.',
+    )
+    parser.add_argument('directory', help='directory of .sql files(recursive).')
+    parser.add_argument('-k', '--api-key', help='redash api key', default=None)
+    parser.add_argument('-s', '--server-host', help='redash host i.e) https://your-redash-server/', default=None)
+    parser.add_argument('-p', '--proxy', help='proxy url', default=None)
+    parser.add_argument(
+        '-d', '--data-source-name', default=None,
+        help='datasource of files without "-- datasource: name" header.',
+    )
+    parser.add_argument(
+        '--manifest', default=None,
+        help=f'synced query ids and hashes. default DIRECTORY/{constants.SYNC_MANIFEST_NAME}',
+    )
+    parser.add_argument(
+        '--parallelism', type=int, default=constants.DEFAULT_SYNC_PARALLELISM,
+        help='concurrent api calls.',
+    )
+    parser.add_argument(
+        '--rate-limit', type=float,
+        default=float(os.environ.get('REDAQL_RATE_LIMIT', constants.DEFAULT_RATE_LIMIT)),
+        help='max redash api requests per second. 0 is unlimited.',
+    )
+    parser.add_argument('--force', action='store_true', help='update unchanged queries too.')
+    parser.add_argument('--dry-run', action='store_true', help='show changes without api calls.')
+    args = parser.parse_args(argv)
+
+    root = args.directory
+    if not os.path.isdir(root):
+        print(f'[ERROR] {root} is not a directory.')
+        sys.exit(1)
+    host = args.server_host or os.environ.get('REDASH_SERVICE_URL')
+    try:
+        manifest = Manifest(args.manifest or os.path.join(root, constants.SYNC_MANIFEST_NAME), host)
+    except InvalidArgumentException as e:
+        print(f'[ERROR] {e}')
+        sys.exit(1)
+    files = [SqlFile.load(root, path, args.data_source_name) for path in find_sql_files(root)]
+    actions = plan(files, manifest, force=args.force)
+    removed = sorted(set(manifest.entries) - {sql_file.path for sql_file in files})
+    for path in removed:
+        # saved queries are not deleted
+        print(f'[WARN] {path} is removed. query {manifest.entries[path]["id"]} is kept on redash.')
+
+    if args.dry_run:
+        for action, sql_file, query_id in actions:
+            if action != ACTION_UNCHANGED:
+                print(f'{action} {sql_file.path}' + (f' (query {query_id})' if query_id else ''))
+        changed = sum(1 for action, _, _ in actions if action != ACTION_UNCHANGED)
+        print(f'{changed} to sync, {len(actions) - changed} unchanged.')
+        return
+
+    start = time.time()
+    try:
+        client = RedaqlAPIClient(
+            api_key=args.api_key,
+            host=host,
+            proxy=args.proxy,
+            rate_limit=args.rate_limit,
+            pool_size=max(args.parallelism, constants.DEFAULT_POOL_SIZE),
+        )
+        syncer = Syncer(client, manifest, parallelism=args.parallelism)
+        counts, errors = syncer.sync(actions)
+    except (RedashPyException, requests.RequestException) as e:
+        print(f'[ERROR] {e}')
+        sys.exit(1)
+    print(
+        f'{counts[ACTION_CREATE]} created, {counts[ACTION_UPDATE]} updated, {counts[ACTION_UNCHANGED]} unchanged, '
+        f'{len(errors)} errors. Time: {time.time() - start:.4f}s'
+    )
+    if errors:
+        sys.exit(1)
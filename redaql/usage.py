@@ -0,0 +1,168 @@
+import json
+import os
+import threading
+import time
+
+from collections import defaultdict
+
+from prompt_toolkit.completion import Completer
+
+from redaql import constants
+from redaql.statement_splitter import iter_tokens
+
+_SECONDS_PER_DAY = 24 * 60 * 60
+_QUOTES = '"`['
+
+
+class UsageIndex:
+    """
+    usage of tables and columns in executed statements, by server and datasource.
+    score decays by half life, so that recently used identifiers rank higher.
+    appended to a file as json lines, and compacted when it grows.
+    """
+
+    def __init__(self, path, half_life_days=constants.USAGE_HALF_LIFE_DAYS, max_lines=constants.USAGE_MAX_LINES):
+        self.path = path
+        self.half_life = half_life_days * _SECONDS_PER_DAY
+        self.max_lines = max_lines
+        self._lock = threading.Lock()
+        # (host, datasource) -> word -> [count, score, last used at]
+        self._usage = None
+        self._lines = 0
+
+    def record(self, host, datasource, sql, identifiers):
+        """
+        :param str host: redash server. datasources of the same name on different servers are different.
+        :param str sql: executed statement
+        :param identifiers: known table and column names of the datasource. other words are ignored.
+        """
+        known = {word.lower(): word for word in identifiers}
+        words = sorted({known[name] for name in extract_names(sql) if name in known})
+        if not words:
+            return
+        now = time.time()
+        key = _usage_key(host, datasource)
+        with self._lock:
+            self._load()
+            for word in words:
+                self._observe(key, word, 1, 1.0, now)
+            self._lines += len(words)
+            if self._lines > self.max_lines:
+                self._compact()
+                return
+            with open(self.path, 'a', encoding='utf-8') as f:
+                for word in words:
+                    f.write(json.dumps({'host': key[0], 'datasource': datasource, 'word': word, 'at': now}) + '\n')
+
+    def get_usage(self, host, datasource):
+        """
+        :return: {word: (count, score)}
+        """
+        now = time.time()
+        with self._lock:
+            self._load()
+            return {
+                word: (count, self._decay(score, now - at))
+                for word, (count, score, at) in self._usage.get(_usage_key(host, datasource), {}).items()
+            }
+
+    def _observe(self, key, word, count, score, at):
+        entry = self._usage[key].get(word)
+        if entry is None:
+            self._usage[key][word] = [count, score, at]
+            return
+        last = max(entry[2], at)
+        entry[0] += count
+        entry[1] = self._decay(entry[1], last - entry[2]) + self._decay(score, last - at)
+        entry[2] = last
+
+    def _decay(self, score, elapsed):
+        return score * 0.5 ** (max(elapsed, 0) / self.half_life)
+
+    def _load(self):
+        if self._usage is not None:
+            return
+        self._usage = defaultdict(dict)
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    # compacted line has count and score
+                    # lines without host were recorded before servers were distinguished, and never match
+                    self._observe(
+                        (entry.get('host'), entry['datasource']), entry['word'],
+                        entry.get('count', 1), entry.get('score', 1.0), entry['at'],
+                    )
+                except (ValueError, KeyError):
+                    continue
+                self._lines += 1
+
+    def _compact(self):
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        self._lines = 0
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for (host, datasource), words in self._usage.items():
+                for word, (count, score, at) in words.items():
+                    f.write(json.dumps({
+                        'host': host, 'datasource': datasource, 'word': word, 'count': count, 'score': score, 'at': at,
+                    }) + '\n')
+                    self._lines += 1
+        os.replace(tmp_path, self.path)
+
+
+def _usage_key(host, datasource):
+    return host.rstrip('/'), datasource
+
+
+def extract_names(sql):
+    """
+    lower cased identifiers in statement. dotted names are yielded as a whole and by parts.
+    i.e) public.users -> public.users, public, users
+    """
+    names = set()
+    parts = []
+    dotted = False
+    for kind, text in iter_tokens(sql):
+        if kind in ('word', 'quoted_identifier'):
+            name = text.strip(_QUOTES + ']').lower() if kind == 'quoted_identifier' else text.lower()
+            if not dotted and parts:
+                names.add('.'.join(parts))
+                parts = []
+            parts.append(name)
+            names.add(name)
+            dotted = False
+        elif kind == 'other' and text == '.' and parts:
+            dotted = True
+        else:
+            if parts:
+                names.add('.'.join(parts))
+            parts = []
+            dotted = False
+    if parts:
+        names.add('.'.join(parts))
+    return names
+
+
+class UsageRankedCompleter(Completer):
+    """
+    reorder completions of the wrapped completer. used words come first by score,
+    and others keep their order.
+    """
+
+    def __init__(self, completer: Completer, usage):
+        """
+        :param dict usage: result of UsageIndex.get_usage
+        """
+        self.completer = completer
+        self.usage = usage
+
+    def get_completions(self, document, complete_event):
+        completions = list(self.completer.get_completions(document, complete_event))
+        if not self.usage:
+            return completions
+        return sorted(
+            completions,
+            key=lambda completion: -self.usage.get(completion.text, (0, 0.0))[1],
+        )
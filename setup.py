@@ -3,7 +3,7 @@ from setuptools import setup
 
 here = os.path.abspath(os.path.dirname(__file__))
 
-packages = ['redaql']
+packages = ['redaql', 'redaql.dialects']
 
 setup(
     packages=packages,